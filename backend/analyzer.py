@@ -11,277 +11,692 @@ Walks a directory, parses every .py file, and builds a JSON graph of:
 
 from __future__ import annotations
 import ast
+import fnmatch
+import hashlib
+import inspect
+import json
 import os
+import re
+import sqlite3
+import sys
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
+
+import orjson
 
 # ---------------------------------------------------------------------------
 # Core data structures
 # ---------------------------------------------------------------------------
 
+# Below this many files the process-pool spawn cost outweighs the parse work.
+_PARALLEL_MIN_FILES = 8
+# Threads used to prefetch file contents ahead of cache lookup / parsing.
+_IO_WORKERS = 4
+
+CACHE_FILENAME = ".chillax_ast_cache.sqlite"
+# Bump whenever the shape or content of analyze_file's result changes.
+_CACHE_VERSION = 3
+
+
+def _record_dict(rec: Any) -> dict[str, Any]:
+    return {name: getattr(rec, name) for name in rec.__slots__}
+
+
+@dataclass(slots=True)
+class FuncInfo:
+    name: str
+    start_line: int
+    end_line: int
+    args: list[str]
+    decorators: list[str]
+    docstring: str
+    issues: list[str]
+    length: int
+    max_depth: int
+    in_degree: int = 0      # Calculated later
+    is_dead: bool = False   # Calculated later
+
+
+@dataclass(slots=True)
+class MethodInfo:
+    name: str
+    start_line: int
+    end_line: int
+    args: list[str]
+    docstring: str
+
+
+@dataclass(slots=True)
+class ClassInfo:
+    name: str
+    start_line: int
+    end_line: int
+    methods: list[MethodInfo]
+    docstring: str
+    issues: list[str]
+    length: int
+    in_degree: int = 0      # Calculated later
+    is_dead: bool = False   # Calculated later
+
+    def to_dict(self) -> dict[str, Any]:
+        d = _record_dict(self)
+        d["methods"] = [_record_dict(m) for m in self.methods]
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> ClassInfo:
+        return cls(**{**d, "methods": [MethodInfo(**m) for m in d["methods"]]})
+
+
+@dataclass(slots=True)
+class ModuleInfo:
+    """Analysis result for one file.
+
+    Slotted records keep per‑file results compact (also when pickled back
+    from pool workers) and give attribute access in analyze_project's
+    post‑pass; they are turned into plain dicts only at the JSON boundary.
+    """
+    module: str
+    functions: list[FuncInfo]
+    classes: list[ClassInfo]
+    imports: list[str]
+    calls: list[str]
+    issues: list[str]
+
+    def to_dict(self) -> dict[str, Any]:
+        d = _record_dict(self)
+        d["functions"] = [_record_dict(f) for f in self.functions]
+        d["classes"] = [c.to_dict() for c in self.classes]
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> ModuleInfo:
+        return cls(**{
+            **d,
+            "functions": [FuncInfo(**f) for f in d["functions"]],
+            "classes": [ClassInfo.from_dict(c) for c in d["classes"]],
+        })
+
+
 def _rel(path: str, root: str) -> str:
     """Return a forward‑slash relative path."""
     return str(Path(path).relative_to(root)).replace("\\", "/")
 
 
+# Never descended into (hidden directories are skipped as well).
+_SKIP_DIRS = frozenset({"__pycache__", "venv", ".venv", "env", "node_modules", "build", "dist"})
+
+IGNORE_FILENAME = ".chillaxignore"
+# Generated / vendored files above this size cost a lot to parse and add
+# little structure, so they are reported as skipped instead.
+MAX_FILE_BYTES = 1024 * 1024
+
+
+def _load_ignore(root: str) -> re.Pattern[str] | None:
+    """Compile <root>/.chillaxignore into one regex over forward‑slash relative paths.
+
+    One glob per line; ``#`` starts a comment.  Patterns containing a slash
+    are anchored at the project root, bare patterns match at any depth.
+    Matching a directory prunes everything below it.
+    """
+    try:
+        with open(os.path.join(root, IGNORE_FILENAME), "r", encoding="utf-8") as f:
+            lines = [line.strip() for line in f]
+    except OSError:
+        return None
+    parts = []
+    for line in lines:
+        if not line or line.startswith("#"):
+            continue
+        pat = line.strip("/")
+        if not pat:
+            continue
+        regex = fnmatch.translate(pat)
+        parts.append(regex if "/" in pat else r"(?:.*/)?" + regex)
+    return re.compile("|".join(parts)) if parts else None
+
+
+def _iter_py(root: str, ignore: re.Pattern[str] | None = None,
+             _dir: str | None = None) -> Iterator[str]:
+    """Yield .py files under *root* — files first, then subdirectories.
+
+    Uses os.scandir so entry types come from the directory listing itself,
+    and never descends into hidden, vendored or *ignore*d directories.
+    """
+    try:
+        with os.scandir(_dir or root) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        if ignore is not None and ignore.match(_rel(entry.path, root)):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            if not (entry.name.startswith(".") or entry.name in _SKIP_DIRS):
+                subdirs.append(entry.path)
+        elif entry.name.endswith(".py"):
+            yield entry.path
+    for path in subdirs:
+        yield from _iter_py(root, ignore, path)
+
+
+# ---------------------------------------------------------------------------
+# Name helpers
+# ---------------------------------------------------------------------------
+# Module-level (not staticmethods) and fully typed: these run once per call
+# site / decorator, so they skip the class attribute lookup and stay
+# compilable with mypyc as-is.  AST node classes are never subclassed, so an
+# exact ``type(...) is`` check is safe and cheaper than isinstance().
+
+def _call_name(node: ast.expr) -> str | None:
+    """Return the dotted name of a call target (``a.b.c``), or None."""
+    t = type(node)
+    if t is ast.Name:
+        return node.id
+    if t is ast.Attribute:
+        parts: list[str] = []
+        cur: ast.expr = node
+        while type(cur) is ast.Attribute:
+            parts.append(cur.attr)
+            cur = cur.value
+        if type(cur) is ast.Name:
+            parts.append(cur.id)
+        parts.reverse()
+        # Bare identifiers are already interned by the parser; interning the
+        # joined dotted name too makes repeats (self.x, logger.info) share
+        # one object, so set/dict ops hit the identity fast path.
+        return sys.intern(".".join(parts))
+    return None
+
+
+def _decorator_name(node: ast.expr) -> str:
+    """Return the bare name of a decorator, unwrapping ``@deco(...)`` calls."""
+    while type(node) is ast.Call:
+        node = node.func
+    t = type(node)
+    if t is ast.Name:
+        return node.id
+    if t is ast.Attribute:
+        return node.attr
+    return ""
+
+
+def _docstring(node: ast.AST, clean: bool = False) -> str:
+    """Return the raw docstring of *node* in O(1), or "" if it has none.
+
+    ``ast.get_docstring`` always runs ``inspect.cleandoc``; that whitespace
+    normalisation is only done here when *clean* is requested.
+    """
+    body = node.body
+    if body and type(body[0]) is ast.Expr:
+        value = body[0].value
+        if type(value) is ast.Constant and type(value.value) is str:
+            return inspect.cleandoc(value.value) if clean else value.value
+    return ""
+
+
 # ---------------------------------------------------------------------------
 # AST visitors
 # ---------------------------------------------------------------------------
 
-class _FileVisitor(ast.NodeVisitor):
-    """Extract functions, classes, imports, and intra‑project calls."""
+class _FileVisitor:
+    """Extract functions, classes, imports, and intra‑project calls.
+
+    Holds the per‑file state; the traversal itself is the single‑pass
+    ``_walk`` below, which dispatches on the node's concrete type through
+    ``_HANDLERS`` instead of ``ast.NodeVisitor``'s per‑node
+    ``"visit_" + classname`` lookup and bound‑method creation.
+    """
+
+    def __init__(self, clean_docstrings: bool = False):
+        self.reset(clean_docstrings)
 
-    def __init__(self, source: str):
-        self.source_lines = source.splitlines()
-        self.functions: list[dict] = []
-        self.classes: list[dict] = []
+    def reset(self, clean_docstrings: bool = False) -> None:
+        """Prepare for the next file.
+
+        The containers are rebound rather than cleared: the previous file's
+        result dict still references them (and a pool worker may not have
+        pickled it yet).
+        """
+        self.clean_docstrings = clean_docstrings
+        self.functions: list[FuncInfo] = []
+        self.classes: list[ClassInfo] = []
         self.imports: list[str] = []
-        self.calls: list[str] = []
+        self.calls: set[str] = set()
         self._current_func: str | None = None
 
-    def _get_max_depth(self, node: ast.AST, current_depth: int = 0) -> int:
-        if not hasattr(node, "body") and not hasattr(node, "orelse"):
-            return current_depth
-        
-        max_d = current_depth
-        for child in ast.iter_child_nodes(node):
-            if isinstance(child, (ast.If, ast.For, ast.While, ast.With, ast.Try, ast.ExceptHandler)):
-                d = self._get_max_depth(child, current_depth + 1)
-                max_d = max(max_d, d)
-            else:
-                d = self._get_max_depth(child, current_depth)
-                max_d = max(max_d, d)
-        return max_d
-
-    # --- functions --------------------------------------------------------
-    def visit_FunctionDef(self, node: ast.FunctionDef):
-        length = (node.end_lineno or node.lineno) - node.lineno
-        args_count = len(node.args.args)
-        max_depth = self._get_max_depth(node)
-        
-        issues = []
-        if length > 50:
-            issues.append(f"God Function (>{50} lines)")
-        if args_count > 6:
-            issues.append(f"Too many arguments ({args_count})")
-        if max_depth > 4:
-            issues.append(f"Deep Nesting (depth {max_depth})")
-
-        info = {
-            "name": node.name,
-            "start_line": node.lineno,
-            "end_line": node.end_lineno or node.lineno,
-            "args": [a.arg for a in node.args.args],
-            "decorators": [self._decorator_name(d) for d in node.decorator_list],
-            "docstring": ast.get_docstring(node) or "",
-            "issues": issues,
-            "length": length,
-            "max_depth": max_depth,
-            "in_degree": 0, # Calculated later
-            "is_dead": False # Calculated later
-        }
-        self.functions.append(info)
-        old = self._current_func
-        self._current_func = node.name
-        self.generic_visit(node)
-        self._current_func = old
-
-    visit_AsyncFunctionDef = visit_FunctionDef
-
-    # --- classes ----------------------------------------------------------
-    def visit_ClassDef(self, node: ast.ClassDef):
-        methods: list[dict] = []
-        issues = []
-        length = (node.end_lineno or node.lineno) - node.lineno
-        if length > 200:
-             issues.append(f"God Class (>{200} lines)")
-
-        for item in ast.walk(node):
-            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                methods.append({
-                    "name": item.name,
-                    "start_line": item.lineno,
-                    "end_line": item.end_lineno or item.lineno,
-                    "args": [a.arg for a in item.args.args],
-                    "docstring": ast.get_docstring(item) or "",
-                })
-        
-        self.classes.append({
-            "name": node.name,
-            "start_line": node.lineno,
-            "end_line": node.end_lineno or node.lineno,
-            "methods": methods,
-            "docstring": ast.get_docstring(node) or "",
-            "issues": issues,
-            "length": length,
-            "in_degree": 0, # Calculated later
-            "is_dead": False
-        })
-        # FIX: Do NOT call self.generic_visit(node) here.
-        # Calling it would cause visit_FunctionDef to fire for every method
-        # inside the class, adding them to self.functions a second time and
-        # inflating function counts / dead-code analysis results.
-
-    # --- imports ----------------------------------------------------------
-    def visit_Import(self, node: ast.Import):
-        for alias in node.names:
-            self.imports.append(alias.name)
-
-    def visit_ImportFrom(self, node: ast.ImportFrom):
-        if node.module:
-            self.imports.append(node.module)
-
-    # --- calls ------------------------------------------------------------
-    def visit_Call(self, node: ast.Call):
-        name = self._call_name(node.func)
-        if name:
-            self.calls.append(name)
-        self.generic_visit(node)
-
-    # --- helpers ----------------------------------------------------------
-    @staticmethod
-    def _call_name(node: ast.expr) -> str | None:
-        if isinstance(node, ast.Name):
-            return node.id
-        if isinstance(node, ast.Attribute):
-            parts = []
-            cur = node
-            while isinstance(cur, ast.Attribute):
-                parts.append(cur.attr)
-                cur = cur.value
-            if isinstance(cur, ast.Name):
-                parts.append(cur.id)
-            return ".".join(reversed(parts))
-        return None
+    def visit(self, tree: ast.AST) -> None:
+        _walk(tree, self)
+
+
+# One visitor per thread (and so per pool worker), reused across files.
+_local = threading.local()
+
+
+def _get_visitor() -> _FileVisitor:
+    visitor = getattr(_local, "visitor", None)
+    if visitor is None:
+        visitor = _local.visitor = _FileVisitor()
+    return visitor
+
 
-    @staticmethod
-    def _decorator_name(node: ast.expr) -> str:
-        if isinstance(node, ast.Name):
-            return node.id
-        if isinstance(node, ast.Attribute):
-            return node.attr
-        if isinstance(node, ast.Call):
-            return _FileVisitor._decorator_name(node.func)
-        return ""
+def _get_max_depth(node: ast.AST, current_depth: int = 0) -> int:
+    if not hasattr(node, "body") and not hasattr(node, "orelse"):
+        return current_depth
+    
+    max_d = current_depth
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.If, ast.For, ast.While, ast.With, ast.Try, ast.ExceptHandler)):
+            d = _get_max_depth(child, current_depth + 1)
+            max_d = max(max_d, d)
+        else:
+            d = _get_max_depth(child, current_depth)
+            max_d = max(max_d, d)
+    return max_d
+
+
+def _walk(node: ast.AST, v: _FileVisitor) -> None:
+    """Visit every node exactly once; handlers own recursion into their children."""
+    handler = _HANDLERS.get(type(node))
+    if handler is not None:
+        handler(node, v)
+        return
+    for child in ast.iter_child_nodes(node):
+        _walk(child, v)
+
+
+def _walk_body(node: ast.AST, name: str, v: _FileVisitor) -> None:
+    """Walk a function's children with *name* as the enclosing function."""
+    old = v._current_func
+    v._current_func = name
+    for child in ast.iter_child_nodes(node):
+        _walk(child, v)
+    v._current_func = old
+
+
+# --- functions --------------------------------------------------------
+def _h_function(node: ast.FunctionDef, v: _FileVisitor) -> None:
+    length = (node.end_lineno or node.lineno) - node.lineno
+    args_count = len(node.args.args)
+    max_depth = _get_max_depth(node)
+    
+    issues = []
+    if length > 50:
+        issues.append(f"God Function (>{50} lines)")
+    if args_count > 6:
+        issues.append(f"Too many arguments ({args_count})")
+    if max_depth > 4:
+        issues.append(f"Deep Nesting (depth {max_depth})")
+
+    v.functions.append(FuncInfo(
+        name=node.name,
+        start_line=node.lineno,
+        end_line=node.end_lineno or node.lineno,
+        args=[a.arg for a in node.args.args],
+        decorators=[_decorator_name(d) for d in node.decorator_list],
+        docstring=_docstring(node, v.clean_docstrings),
+        issues=issues,
+        length=length,
+        max_depth=max_depth,
+    ))
+    _walk_body(node, node.name, v)
+
+
+# --- classes ----------------------------------------------------------
+def _h_class(node: ast.ClassDef, v: _FileVisitor) -> None:
+    methods: list[MethodInfo] = []
+    issues = []
+    length = (node.end_lineno or node.lineno) - node.lineno
+    if length > 200:
+         issues.append(f"God Class (>{200} lines)")
+
+    # Only direct children are methods of *this* class; nested classes
+    # are picked up by the normal walk below.
+    for item in node.body:
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            methods.append(MethodInfo(
+                name=item.name,
+                start_line=item.lineno,
+                end_line=item.end_lineno or item.lineno,
+                args=[a.arg for a in item.args.args],
+                docstring=_docstring(item, v.clean_docstrings),
+            ))
+    
+    v.classes.append(ClassInfo(
+        name=node.name,
+        start_line=node.lineno,
+        end_line=node.end_lineno or node.lineno,
+        methods=methods,
+        docstring=_docstring(node, v.clean_docstrings),
+        issues=issues,
+        length=length,
+    ))
+    # NOTE: methods must not go through _h_function — that would add them
+    # to v.functions a second time and inflate function counts / dead-code
+    # results.  Walk their bodies directly so calls and imports made inside
+    # methods are still recorded.
+    for item in node.body:
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            _walk_body(item, item.name, v)
+        else:
+            _walk(item, v)
+
+
+# --- imports ----------------------------------------------------------
+def _h_import(node: ast.Import, v: _FileVisitor) -> None:
+    for alias in node.names:
+        v.imports.append(alias.name)
+
+
+def _h_import_from(node: ast.ImportFrom, v: _FileVisitor) -> None:
+    if node.module:
+        v.imports.append(node.module)
+
+
+# --- calls ------------------------------------------------------------
+def _h_call(node: ast.Call, v: _FileVisitor) -> None:
+    name = _call_name(node.func)
+    if name:
+        v.calls.add(name)
+    for child in ast.iter_child_nodes(node):
+        _walk(child, v)
+
+
+_HANDLERS: dict[type, Callable[[Any, _FileVisitor], None]] = {
+    ast.FunctionDef: _h_function,
+    ast.AsyncFunctionDef: _h_function,
+    ast.ClassDef: _h_class,
+    ast.Import: _h_import,
+    ast.ImportFrom: _h_import_from,
+    ast.Call: _h_call,
+}
+
+
+# ---------------------------------------------------------------------------
+# Persistent AST cache
+# ---------------------------------------------------------------------------
+
+class _Cache:
+    """Per‑project SQLite store of analyze results keyed by (path, sha256).
+
+    Entries are invalidated purely by content hash, so an edited file simply
+    misses and a stale row is overwritten on the next run.  If the database
+    cannot be opened (read‑only project, locked file) the cache is a no‑op.
+    """
+
+    def __init__(self, root: str):
+        try:
+            self._db: sqlite3.Connection | None = sqlite3.connect(os.path.join(root, CACHE_FILENAME))
+            if self._db.execute("PRAGMA user_version").fetchone()[0] != _CACHE_VERSION:
+                self._db.execute("DROP TABLE IF EXISTS ast_cache")
+                self._db.execute(f"PRAGMA user_version = {_CACHE_VERSION}")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ast_cache ("
+                "path TEXT, sha TEXT, json BLOB, PRIMARY KEY (path, sha))"
+            )
+        except sqlite3.Error:
+            self._db = None
+
+    def get(self, path: str, sha: str) -> ModuleInfo | None:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT json FROM ast_cache WHERE path = ? AND sha = ?", (path, sha)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return ModuleInfo.from_dict(orjson.loads(row[0])) if row else None
+
+    def put_many(self, rows: list[tuple[str, str, ModuleInfo]]) -> None:
+        """Store fresh results in one transaction — drops older hashes of the same path."""
+        if self._db is None or not rows:
+            return
+        encoded = []
+        for p, sha, info in rows:
+            try:
+                encoded.append((p, sha, orjson.dumps(info.to_dict())))
+            except TypeError:  # orjson.JSONEncodeError, e.g. a lone surrogate — not cached
+                pass
+        try:
+            with self._db:
+                self._db.executemany("DELETE FROM ast_cache WHERE path = ?", [(p,) for p, _, _ in rows])
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO ast_cache (path, sha, json) VALUES (?, ?, ?)",
+                    encoded,
+                )
+        except sqlite3.Error:
+            pass
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
 
 
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
-def analyze_file(filepath: str, root: str) -> dict[str, Any]:
-    """Parse a single .py file and return its structure."""
-    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
-        source = f.read()
+def _read_bytes(filepath: str) -> bytes:
+    with open(filepath, "rb") as f:
+        return f.read()
+
+
+def _stub(filepath: str, root: str, issue: str) -> ModuleInfo:
+    """Module entry for a file that was not (or could not be) parsed."""
+    return ModuleInfo(_rel(filepath, root), [], [], [], [], [issue])
+
+
+def _too_large(size: int) -> str:
+    return f"Skipped – file too large ({size // 1024} KB)"
+
+
+def _read_and_hash(path: str) -> tuple[int, bytes | None, str]:
+    """Return (size, bytes, sha256 hex); bytes is None for oversized files."""
+    size = os.stat(path).st_size
+    if size > MAX_FILE_BYTES:
+        return size, None, ""
+    data = _read_bytes(path)
+    return size, data, hashlib.sha256(data).hexdigest()
+
+
+def analyze_file(filepath: str, root: str, clean_docstrings: bool = False) -> dict[str, Any]:
+    """Parse a single .py file and return its structure.
+
+    Docstrings are returned raw unless *clean_docstrings* is set, in which
+    case they are dedented like ``ast.get_docstring`` does.
+    """
+    size = os.stat(filepath).st_size
+    if size > MAX_FILE_BYTES:
+        return _stub(filepath, root, _too_large(size)).to_dict()
+    return _analyze_bytes(_read_bytes(filepath), filepath, root, clean_docstrings).to_dict()
+
+
+def _analyze_bytes(data: bytes, filepath: str, root: str,
+                   clean_docstrings: bool = False) -> ModuleInfo:
+    """Parse already‑read file contents and return the module structure."""
+    # compile(..., PyCF_ONLY_AST) is what ast.parse calls underneath, minus
+    # its Python‑level argument handling.  It accepts bytes directly
+    # (honouring any coding cookie); only undecodable files pay for a lossy
+    # decode and a second attempt.
     try:
-        tree = ast.parse(source, filename=filepath)
+        tree = compile(data, filepath, "exec", ast.PyCF_ONLY_AST)
     except SyntaxError:
-        return {
-            "module": _rel(filepath, root),
-            "functions": [],
-            "classes": [],
-            "imports": [],
-            "calls": [],
-            "issues": ["SyntaxError – could not parse"],
-        }
-
-    visitor = _FileVisitor(source)
+        tree = None
+    if tree is None:
+        try:
+            tree = compile(data.decode("utf-8", errors="replace"), filepath, "exec", ast.PyCF_ONLY_AST)
+        except SyntaxError:
+            tree = None
+    if tree is None:
+        return _stub(filepath, root, "SyntaxError – could not parse")
+
+    visitor = _get_visitor()
+    visitor.reset(clean_docstrings)
     visitor.visit(tree)
 
-    return {
-        "module": _rel(filepath, root),
-        "functions": visitor.functions,
-        "classes": visitor.classes,
-        "imports": visitor.imports,
-        "calls": list(set(visitor.calls)),
-        "issues": []
-    }
+    return ModuleInfo(
+        module=_rel(filepath, root),
+        functions=visitor.functions,
+        classes=visitor.classes,
+        imports=visitor.imports,
+        calls=list(visitor.calls),
+        issues=[],
+    )
 
 
 def analyze_project(root: str) -> dict[str, Any]:
     """Walk *root*, analyze every .py file, and return a project graph."""
     root = os.path.abspath(root)
-    modules: list[dict] = []
-    
-    # Track items for establishing relationships
-    # Maps function/class name to a list of (module_id, obj_dict)
-    all_exports: dict[str, list[tuple[str, dict]]] = {}
 
-    for dirpath, _dirs, files in os.walk(root):
-        parts = Path(dirpath).parts
-        if any(p.startswith(".") or p in ("__pycache__", "venv", "node_modules") for p in parts):
-            continue
-        for fname in sorted(files):
-            if not fname.endswith(".py"):
+    paths = list(_iter_py(root, _load_ignore(root)))
+
+    # Unchanged files are served from the cache; only misses get parsed.
+    cache = _Cache(root)
+    modules: list[ModuleInfo | None] = []
+    misses: list[tuple[int, str, str, str, bytes]] = []
+    # Reads (and hashing, which releases the GIL) run on a small thread
+    # pool and are consumed in order, so disk latency overlaps with the
+    # cache lookups instead of adding up file by file.
+    with ThreadPoolExecutor(max_workers=_IO_WORKERS) as io_pool:
+        for path, (size, data, sha) in zip(paths, io_pool.map(_read_and_hash, paths)):
+            if data is None:
+                modules.append(_stub(path, root, _too_large(size)))
                 continue
-            fullpath = os.path.join(dirpath, fname)
-            info = analyze_file(fullpath, root)
-            modules.append(info)
-
-            # Register exports for linking dependencies
-            mod_id = info["module"]
-            for fn in info["functions"]:
-                all_exports.setdefault(fn["name"], []).append((mod_id, fn))
-            for cls in info["classes"]:
-                all_exports.setdefault(cls["name"], []).append((mod_id, cls))
+            rel = _rel(path, root)
+            cached = cache.get(rel, sha)
+            if cached is None:
+                misses.append((len(modules), path, rel, sha, data))
+            modules.append(cached)
+
+    miss_paths = [m[1] for m in misses]
+    miss_data = [m[4] for m in misses]
+    # Parsing is CPU-bound and holds the GIL, so fan out across processes.
+    if len(misses) < _PARALLEL_MIN_FILES:
+        parsed = [_analyze_bytes(d, p, root) for d, p in zip(miss_data, miss_paths)]
+    else:
+        # One worker per chunk of 8 misses at most, so small miss sets
+        # don't pay for spawning a full pool
+        workers = min(os.cpu_count() or 1, -(-len(misses) // 8))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(_analyze_bytes, miss_data, miss_paths, repeat(root), chunksize=8))
+
+    cache.put_many([(rel, sha, info) for (_, _, rel, sha, _), info in zip(misses, parsed)])
+    cache.close()
+    for (idx, _, _, _, _), info in zip(misses, parsed):
+        modules[idx] = info
+
+    # Exports (functions + classes) are tracked struct‑of‑arrays style:
+    # parallel columns indexed by export id, plus a name → [ids] index.
+    # The O(modules × calls) edge pass then only bumps ints in a flat
+    # array; the per‑object records are touched once at the end.
+    MAGIC_ENTRY = {"main", "run", "setup", "__init__"}
+    exp_objs: list[FuncInfo | ClassInfo] = []
+    exp_names: list[str] = []
+    exp_mods: list[str] = []
+    exp_is_func: list[bool] = []
+    by_name: dict[str, list[int]] = {}
+    for info in modules:
+        # Names coming back from pool workers / the cache are fresh copies;
+        # intern them so the edge pass compares by identity.
+        mod_id = info.module = sys.intern(info.module)
+        for objs, is_func in ((info.functions, True), (info.classes, False)):
+            for obj in objs:
+                name = sys.intern(obj.name)
+                by_name.setdefault(name, []).append(len(exp_objs))
+                exp_objs.append(obj)
+                exp_names.append(name)
+                exp_mods.append(mod_id)
+                exp_is_func.append(is_func)
+    in_degree = array("i", bytes(4 * len(exp_objs)))
 
     edges: list[dict] = []
     # Build edges and calculate in_degree
     for mod in modules:
-        for call_name in mod.get("calls", []):
-            base = call_name.split(".")[0]
+        mod_id = mod.module
+        for call_name in mod.calls:
+            # partition() avoids allocating a list just to read element 0
+            base = call_name.partition(".")[0]
             # Simple heuristic: if the base name matches a known export
-            targets = all_exports.get(base, [])
-            for target_mod, target_obj in targets:
-                if target_mod != mod["module"]:
+            for idx in by_name.get(base, ()):
+                target_mod = exp_mods[idx]
+                if target_mod != mod_id:
                     # Inter-module edge
                     edges.append({
-                        "source": mod["module"],
+                        "source": mod_id,
                         "target": target_mod,
                         "label": call_name,
                     })
                 # Bump in_degree for the specific function/class
-                target_obj["in_degree"] += 1
+                in_degree[idx] += 1
 
-    # Mark dead code (0 in_degree) EXCEPT special functions 
-    MAGIC_ENTRY = {"main", "run", "setup", "__init__"}
-    for mod in modules:
-        for fn in mod["functions"]:
-            if fn["in_degree"] == 0 and fn["name"] not in MAGIC_ENTRY and not fn["name"].startswith("__"):
-                fn["is_dead"] = True
-        for cls in mod["classes"]:
-            if cls["in_degree"] == 0 and not cls["name"].startswith("__"):
-                cls["is_dead"] = True
+    # Write in_degree back and mark dead code (0 in_degree) EXCEPT special functions
+    for obj, name, is_func, deg in zip(exp_objs, exp_names, exp_is_func, in_degree):
+        obj.in_degree = deg
+        if deg == 0 and not name.startswith("__") and not (is_func and name in MAGIC_ENTRY):
+            obj.is_dead = True
 
     return {
         "root": root.replace("\\", "/"),
-        "modules": modules,
+        "modules": [m.to_dict() for m in modules],
         "edges": edges,
         "stats": {
             "total_modules": len(modules),
-            "total_functions": sum(len(m["functions"]) for m in modules),
-            "total_classes": sum(len(m["classes"]) for m in modules),
+            "total_functions": sum(len(m.functions) for m in modules),
+            "total_classes": sum(len(m.classes) for m in modules),
         },
     }
 
 
-def search_graph(graph: dict, keywords: list[str]) -> list[dict]:
-    results: list[dict] = []
-    kw_lower = [k.lower() for k in keywords]
+def graph_to_bytes(graph: dict[str, Any]) -> bytes:
+    """Serialize a project graph to JSON bytes with orjson (C encoder, no str round‑trip).
+
+    orjson rejects strings that are not valid UTF-8 (lone surrogates from
+    escapes or surrogateescape-decoded names); those graphs go through the
+    stdlib encoder, which escapes them.
+    """
+    try:
+        return orjson.dumps(graph)
+    except TypeError:
+        return json.dumps(graph).encode()
+
+
+def build_search_index(graph: dict) -> list[tuple[dict, str]]:
+    """Pair each module with its lower‑cased module/function/class names.
+
+    Built once per analysis so queries never re‑lowercase names.
+    """
+    index: list[tuple[dict, str]] = []
     for mod in graph.get("modules", []):
-        mod_name_lower = mod["module"].lower()
-        if any(k in mod_name_lower for k in kw_lower):
-            results.append(mod)
-            continue
-        for fn in mod.get("functions", []):
-            if any(k in fn["name"].lower() for k in kw_lower):
-                results.append(mod)
-                break
-        for cls in mod.get("classes", []):
-            if any(k in cls["name"].lower() for k in kw_lower):
-                results.append(mod)
-                break
-    return results
+        names = [mod["module"]]
+        names.extend(fn["name"] for fn in mod.get("functions", []))
+        names.extend(cls["name"] for cls in mod.get("classes", []))
+        index.append((mod, "\n".join(names).lower()))
+    return index
+
+
+def search_graph(graph: dict, keywords: list[str],
+                 index: list[tuple[dict, str]] | None = None) -> list[dict]:
+    """Return modules whose names match any keyword, most hits first."""
+    if not keywords:
+        return []
+    if index is None:
+        index = build_search_index(graph)
+    # One compiled alternation scans each module's names in a single pass.
+    pat = re.compile("|".join(re.escape(k.lower()) for k in keywords))
+    scored: list[tuple[int, dict]] = []
+    for mod, text in index:
+        hits = len(pat.findall(text))
+        if hits:
+            scored.append((hits, mod))
+    scored.sort(key=lambda t: -t[0])  # stable: ties keep project order
+    return [mod for _, mod in scored]
 
 
 def get_file_content(filepath: str) -> str:
@@ -5,22 +5,30 @@ integrated terminal via WebSocket, and Python execution.
 """
 
 from __future__ import annotations
+import ast
 import asyncio
+import codecs
 import os
 import re
 import shutil
+import stat
 import subprocess
 import sys
-import json
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Callable, Optional
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Query
+import anyio
+import orjson
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from analyzer import analyze_project, search_graph, get_file_content, analyze_file
-from ollama_client import generate, list_models
+from analyzer import (analyze_project, build_search_index, search_graph, get_file_content,
+                      analyze_file, graph_to_bytes)
+from ollama_client import aclose as close_ollama, generate, generate_stream, list_models
 
 # ---------------------------------------------------------------------------
 # App setup
@@ -36,43 +44,106 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await close_ollama()
+
+
 # In-memory state
 _project_graph: dict | None = None
 _project_root: str | None = None
+_project_root_norm: str | None = None  # resolved _project_root, for traversal checks
+# Lookup indexes over _project_graph, rebuilt on every /analyze
+_modules_by_name: dict[str, dict] = {}
+_callers: dict[str, set[str]] = {}
+_callees: dict[str, set[str]] = {}
+_search_index: list[tuple[dict, str]] = []
 _recent_projects: list[str] = []
+_recent_dirty = False
 
 SAMPLE_PROJECT = str(Path(__file__).resolve().parent / "sample_project")
 RECENT_FILE = str(Path(__file__).resolve().parent / ".recent_projects.json")
 
 
+def _posix(p: str) -> str:
+    """Forward-slash form of a native path; a no-op on POSIX."""
+    return p.replace("\\", "/") if os.sep == "\\" else p
+
+
 def _load_recent():
     global _recent_projects
     try:
         if os.path.exists(RECENT_FILE):
-            with open(RECENT_FILE, "r") as f:
-                _recent_projects = json.load(f)
+            with open(RECENT_FILE, "rb") as f:
+                _recent_projects = orjson.loads(f.read())
     except Exception:
         _recent_projects = []
 
 def _save_recent():
+    global _recent_dirty
+    if not _recent_dirty:
+        return
+    # Write-then-rename so a crash mid-write never leaves a truncated file
+    tmp = RECENT_FILE + ".tmp"
     try:
-        with open(RECENT_FILE, "w") as f:
-            json.dump(_recent_projects[:10], f)
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(_recent_projects[:10]))
+        os.replace(tmp, RECENT_FILE)
+        _recent_dirty = False
     except Exception:
         pass
 
 def _add_recent(path: str):
-    global _recent_projects
-    path = path.replace("\\", "/")
+    global _recent_projects, _recent_dirty
+    path = _posix(path)
+    if _recent_projects and _recent_projects[0] == path:
+        return  # already most recent — nothing to write
     if path in _recent_projects:
         _recent_projects.remove(path)
     _recent_projects.insert(0, path)
     _recent_projects = _recent_projects[:10]
+    _recent_dirty = True
     _save_recent()
 
 _load_recent()
 
 
+def _set_root(root: str):
+    global _project_root, _project_root_norm
+    _project_root = root
+    _project_root_norm = str(Path(root).resolve())
+
+
+def _index_graph(graph: dict):
+    global _modules_by_name, _callers, _callees, _search_index
+    _modules_by_name = {m["module"]: m for m in graph["modules"]}
+    _search_index = build_search_index(graph)
+    callers: dict[str, set[str]] = {}
+    callees: dict[str, set[str]] = {}
+    for e in graph["edges"]:
+        callers.setdefault(e["target"], set()).add(e["source"])
+        callees.setdefault(e["source"], set()).add(e["target"])
+    _callers, _callees = callers, callees
+
+
+def _safe_join(rel: str) -> Path:
+    """Join *rel* onto the project root, rejecting anything that escapes it.
+
+    The returned path is only normalized, so a symlink is returned as
+    itself and rename/delete act on the link rather than its target. It
+    must stay under the root lexically, through its resolved parent, and
+    once resolved (so reads and writes can't follow a link outside).
+    """
+    base = Path(_project_root_norm or SAMPLE_PROJECT)
+    full = Path(os.path.normpath(base / rel))
+    if not (full.is_relative_to(base)
+            and (full == base or full.parent.resolve().is_relative_to(base))
+            and full.resolve().is_relative_to(base)):
+        raise HTTPException(403, "Path traversal blocked")
+    return full
+
+
 # ---------------------------------------------------------------------------
 # Request / Response models
 # ---------------------------------------------------------------------------
@@ -126,18 +197,18 @@ class NewProjectRequest(BaseModel):
 
 @app.post("/open-project")
 async def open_project(req: OpenProjectRequest):
-    global _project_root, _project_graph
+    global _project_graph
     root = os.path.abspath(req.root)
     if not os.path.isdir(root):
         raise HTTPException(404, f"Directory not found: {root}")
-    _project_root = root
+    _set_root(root)
     _project_graph = None
     _add_recent(root)
-    return {"root": root.replace("\\", "/"), "status": "opened"}
+    return {"root": _posix(root), "status": "opened"}
 
 @app.post("/new-project")
 async def new_project(req: NewProjectRequest):
-    global _project_root, _project_graph
+    global _project_graph
     full_path = os.path.join(os.path.abspath(req.path), req.name)
     os.makedirs(full_path, exist_ok=True)
     # Create a basic main.py
@@ -149,15 +220,30 @@ async def new_project(req: NewProjectRequest):
             # writes the two-character sequence backslash+n instead of a real
             # newline, producing a malformed, single-line Python file.
             f.write('"""\nNew Python project created with Chillax.AI.\n"""\n\n\ndef main():\n    print("Hello, World!")\n\n\nif __name__ == "__main__":\n    main()\n')
-    _project_root = full_path
+    _set_root(full_path)
     _project_graph = None
     _add_recent(full_path)
-    return {"root": full_path.replace("\\", "/"), "status": "created"}
+    return {"root": _posix(full_path), "status": "created"}
+
+_ISDIR_TTL = 2.0
+_isdir_cache: dict[str, tuple[float, bool]] = {}
+
+
+def _isdir_cached(p: str) -> bool:
+    """os.path.isdir with a short TTL — stale answers heal on the next tick."""
+    now = time.monotonic()
+    t, v = _isdir_cache.get(p, (0.0, False))
+    if now - t < _ISDIR_TTL:
+        return v
+    v = os.path.isdir(p)
+    _isdir_cache[p] = (now, v)
+    return v
+
 
 @app.get("/recent-projects")
 async def recent_projects():
     # Filter out non-existent dirs
-    valid = [p for p in _recent_projects if os.path.isdir(p)]
+    valid = [p for p in _recent_projects if _isdir_cached(p)]
     return {"projects": valid}
 
 @app.post("/analyze")
@@ -166,28 +252,36 @@ async def analyze(req: AnalyzeRequest):
     root = req.root or _project_root or SAMPLE_PROJECT
     if not os.path.isdir(root):
         raise HTTPException(404, f"Directory not found: {root}")
-    _project_root = os.path.abspath(root)
-    _project_graph = analyze_project(_project_root)
+    _set_root(os.path.abspath(root))
+    # Parsing (and the process pool it may spawn) runs off the event loop,
+    # so SSE streams and the terminal socket keep flowing meanwhile
+    _project_graph = await anyio.to_thread.run_sync(analyze_project, _project_root)
+    _index_graph(_project_graph)
     _add_recent(_project_root)
-    return _project_graph
+    # The graph is plain dicts/lists — skip jsonable_encoder and encode with orjson.
+    return Response(content=graph_to_bytes(_project_graph), media_type="application/json")
 
 
 # ---------------------------------------------------------------------------
 # Endpoints — AI
 # ---------------------------------------------------------------------------
 
-@app.post("/explain")
-async def explain(req: ExplainRequest):
-    global _project_graph, _project_root
+async def _sse(chunks: AsyncIterator[str], meta: dict | None = None) -> AsyncIterator[bytes]:
+    """Frame streamed text as Server-Sent Events; chunks are JSON strings."""
+    if meta is not None:
+        yield b"event: meta\ndata: " + orjson.dumps(meta) + b"\n\n"
+    async for chunk in chunks:
+        yield b"data: " + orjson.dumps(chunk) + b"\n\n"
+    yield b"event: done\ndata: {}\n\n"
+
+
+def _explain_prompt(req: ExplainRequest) -> tuple[str, str]:
+    """Build the (prompt, system prompt) pair for /explain."""
     if _project_graph is None:
         raise HTTPException(400, "Run /analyze first")
 
     rel_path = req.file_path.replace("\\", "/")
-    module_info = None
-    for mod in _project_graph["modules"]:
-        if mod["module"] == rel_path:
-            module_info = mod
-            break
+    module_info = _modules_by_name.get(rel_path)
 
     context_parts: list[str] = []
     if module_info:
@@ -202,12 +296,12 @@ async def explain(req: ExplainRequest):
         if imports:
             context_parts.append(f"**Imports:** {', '.join(imports)}")
 
-        callers = [e["source"] for e in _project_graph["edges"] if e["target"] == rel_path]
-        callees = [e["target"] for e in _project_graph["edges"] if e["source"] == rel_path]
+        callers = _callers.get(rel_path, ())
+        callees = _callees.get(rel_path, ())
         if callers:
-            context_parts.append(f"**Called by modules:** {', '.join(set(callers))}")
+            context_parts.append(f"**Called by modules:** {', '.join(callers)}")
         if callees:
-            context_parts.append(f"**Calls into modules:** {', '.join(set(callees))}")
+            context_parts.append(f"**Calls into modules:** {', '.join(callees)}")
 
     context_str = "\n".join(context_parts) if context_parts else "No graph context available."
     fn_label = f" (function `{req.function_name}`)" if req.function_name else ""
@@ -232,29 +326,52 @@ async def explain(req: ExplainRequest):
 {user_q}
 
 Explain what this code does, its inputs and outputs, any side effects, and how it connects to the rest of the project. Be concise but thorough."""
+    return prompt, sys_prompt
+
 
+@app.post("/explain")
+async def explain(req: ExplainRequest):
+    prompt, sys_prompt = _explain_prompt(req)
     explanation = await generate(prompt, system=sys_prompt)
     return {"explanation": explanation}
 
 
-@app.post("/ask-project")
-async def ask_project(req: AskProjectRequest):
-    global _project_graph, _project_root
+@app.post("/explain/stream")
+async def explain_stream(req: ExplainRequest):
+    prompt, sys_prompt = _explain_prompt(req)
+    return StreamingResponse(_sse(generate_stream(prompt, system=sys_prompt)),
+                             media_type="text/event-stream")
+
+
+_WORD_RE = re.compile(r"[a-zA-Z_]\w*")
+_STOP_WORDS = frozenset({
+    "how", "does", "do", "the", "what", "is", "a", "an", "in",
+    "of", "to", "and", "or", "if", "this", "that", "work",
+    "works", "about", "can", "i", "it", "when", "where", "why",
+    "which", "are", "was", "be", "has", "have", "will", "would",
+    "could", "should", "my", "me", "for", "with", "on", "at",
+    "from", "by", "not", "but", "all", "any", "each", "every",
+})
+# Matches only keyword tokens: 3+ chars, not a stop word, and never starting
+# inside a longer identifier — so no throwaway stop-word tokens are built.
+_KW_RE = re.compile(
+    r"(?<![a-zA-Z_])(?!(?:"
+    + "|".join(sorted(_STOP_WORDS, key=len, reverse=True))
+    + r")\b)[a-zA-Z_]\w{2,}"
+)
+
+
+def _ask_prompt(req: AskProjectRequest) -> tuple[str, str, list[dict], list[str]]:
+    """Build (prompt, system prompt, referenced files, keywords) for /ask-project."""
     if _project_graph is None:
         raise HTTPException(400, "Run /analyze first")
 
-    stop_words = {"how", "does", "do", "the", "what", "is", "a", "an", "in",
-                  "of", "to", "and", "or", "if", "this", "that", "work",
-                  "works", "about", "can", "i", "it", "when", "where", "why",
-                  "which", "are", "was", "be", "has", "have", "will", "would",
-                  "could", "should", "my", "me", "for", "with", "on", "at",
-                  "from", "by", "not", "but", "all", "any", "each", "every"}
-    words = re.findall(r"[a-zA-Z_]\w*", req.question.lower())
-    keywords = [w for w in words if w not in stop_words and len(w) > 2]
+    question = req.question.lower()
+    keywords = _KW_RE.findall(question)
     if not keywords:
-        keywords = words[:3]
+        keywords = _WORD_RE.findall(question)[:3]
 
-    relevant_modules = search_graph(_project_graph, keywords)
+    relevant_modules = search_graph(_project_graph, keywords, _search_index)
 
     snippets: list[str] = []
     referenced_files: list[dict] = []
@@ -299,7 +416,12 @@ async def ask_project(req: AskProjectRequest):
 {"".join(snippets)}
 
 Based on the code above, answer the developer's question. Explain the end-to-end flow, mention key files and functions, and highlight external dependencies or side effects. Use markdown."""
+    return prompt, sys_prompt, referenced_files, keywords
 
+
+@app.post("/ask-project")
+async def ask_project(req: AskProjectRequest):
+    prompt, sys_prompt, referenced_files, keywords = _ask_prompt(req)
     answer = await generate(prompt, system=sys_prompt)
     return {
         "answer": answer,
@@ -307,6 +429,14 @@ Based on the code above, answer the developer's question. Explain the end-to-end
         "keywords_used": keywords,
     }
 
+
+@app.post("/ask-project/stream")
+async def ask_project_stream(req: AskProjectRequest):
+    prompt, sys_prompt, referenced_files, keywords = _ask_prompt(req)
+    meta = {"referenced_files": referenced_files, "keywords_used": keywords}
+    return StreamingResponse(_sse(generate_stream(prompt, system=sys_prompt), meta),
+                             media_type="text/event-stream")
+
 @app.get("/git-context")
 async def git_context(path: str = Query(...)):
     root = _project_root or SAMPLE_PROJECT
@@ -348,49 +478,103 @@ async def list_files(root: str | None = None):
     if not os.path.isdir(target):
         raise HTTPException(404, "Directory not found")
 
-    def build_tree(dir_path: str) -> list[dict]:
-        entries: list[dict] = []
-        try:
-            items = sorted(os.listdir(dir_path))
-        except PermissionError:
-            return entries
-        for name in items:
-            if name.startswith(".") or name in ("__pycache__", "venv", "node_modules", ".git"):
-                continue
-            full = os.path.join(dir_path, name)
-            rel = _rel_to_root(full, target)
-            if os.path.isdir(full):
-                children = build_tree(full)
-                entries.append({"name": name, "path": rel, "type": "directory", "children": children})
-            else:
-                entries.append({"name": name, "path": rel, "type": "file"})
-        return entries
+    return {"root": _posix(target), "tree": await _build_tree_async(target)}
+
+
+_SKIP = frozenset({"__pycache__", "venv", "node_modules", ".git"})
+_tree_limiter: anyio.CapacityLimiter | None = None
 
-    return {"root": target.replace("\\", "/"), "tree": build_tree(target)}
 
+def _tree_level(dir_path: str, cut: int, entries: list[dict]) -> list[tuple[str, list[dict]]]:
+    """Append one directory's nodes to *entries*; return its subdirs still to fill.
 
-def _rel_to_root(path: str, root: str) -> str:
-    return str(Path(path).relative_to(root)).replace("\\", "/")
+    *cut* is the length of the root prefix (with trailing separator), so
+    the relative path is a slice of DirEntry.path rather than a Path op.
+    """
+    try:
+        with os.scandir(dir_path) as it:
+            items = sorted(it, key=lambda e: e.name)
+    except PermissionError:
+        return []
+    subdirs: list[tuple[str, list[dict]]] = []
+    for e in items:
+        name = e.name
+        if name.startswith(".") or name in _SKIP:
+            continue
+        rel = _posix(e.path[cut:])
+        if e.is_dir(follow_symlinks=False):
+            children: list[dict] = []
+            entries.append({"name": name, "path": rel, "type": "directory", "children": children})
+            subdirs.append((e.path, children))
+        else:
+            entries.append({"name": name, "path": rel, "type": "file"})
+    return subdirs
+
+
+def _build_tree(dir_path: str, cut: int, entries: list[dict]):
+    """Walk *dir_path* iteratively with scandir; DirEntry caches the file type."""
+    stack = [(dir_path, entries)]
+    while stack:
+        path, out = stack.pop()
+        stack.extend(_tree_level(path, cut, out))
+
+
+async def _build_tree_async(target: str) -> list[dict]:
+    """Scan the top level, then walk each subdirectory in its own worker thread."""
+    global _tree_limiter
+    if _tree_limiter is None:
+        # Bounded so a wide tree cannot exhaust file descriptors
+        _tree_limiter = anyio.CapacityLimiter(32)
+    tree: list[dict] = []
+    cut = len(os.path.join(target, ""))
+    subdirs = await anyio.to_thread.run_sync(_tree_level, target, cut, tree, limiter=_tree_limiter)
+    await asyncio.gather(*(
+        anyio.to_thread.run_sync(_build_tree, path, cut, children, limiter=_tree_limiter)
+        for path, children in subdirs
+    ))
+    return tree
+
+
+_FAST_READ_MAX = 64 * 1024
+_O_READ = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+
+
+def _fast_read(path: Path, size: int) -> str:
+    """One open, one read, one decode — for small files whose size is known."""
+    fd = os.open(path, _O_READ)
+    try:
+        data = os.read(fd, size)
+    finally:
+        os.close(fd)
+    text = data.decode("utf-8", errors="replace")
+    if "\r" in text:
+        # Match text-mode reads (universal newlines) used everywhere else
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
 
 
 @app.get("/file")
 async def read_file(path: str):
-    root = _project_root or SAMPLE_PROJECT
-    full = os.path.normpath(os.path.join(root, path))
-    if not full.startswith(os.path.normpath(root)):
-        raise HTTPException(403, "Path traversal blocked")
-    if not os.path.isfile(full):
+    full = _safe_join(path)
+    try:
+        st = os.stat(full)
+    except OSError:
         raise HTTPException(404, "File not found")
-    content = get_file_content(full)
+    if not stat.S_ISREG(st.st_mode):
+        raise HTTPException(404, "File not found")
+    if st.st_size < _FAST_READ_MAX:
+        try:
+            content = _fast_read(full, st.st_size)
+        except OSError:
+            content = get_file_content(full)
+    else:
+        content = get_file_content(full)
     return {"path": path, "content": content}
 
 
 @app.post("/file")
 async def save_file(req: SaveFileRequest):
-    root = _project_root or SAMPLE_PROJECT
-    full = os.path.normpath(os.path.join(root, req.path))
-    if not full.startswith(os.path.normpath(root)):
-        raise HTTPException(403, "Path traversal blocked")
+    full = _safe_join(req.path)
     os.makedirs(os.path.dirname(full), exist_ok=True)
     with open(full, "w", encoding="utf-8") as f:
         f.write(req.content)
@@ -399,10 +583,7 @@ async def save_file(req: SaveFileRequest):
 
 @app.post("/file/create")
 async def create_file(req: CreateFileRequest):
-    root = _project_root or SAMPLE_PROJECT
-    full = os.path.normpath(os.path.join(root, req.path))
-    if not full.startswith(os.path.normpath(root)):
-        raise HTTPException(403, "Path traversal blocked")
+    full = _safe_join(req.path)
     if req.is_directory:
         os.makedirs(full, exist_ok=True)
     else:
@@ -414,11 +595,8 @@ async def create_file(req: CreateFileRequest):
 
 @app.post("/file/rename")
 async def rename_file(req: RenameRequest):
-    root = _project_root or SAMPLE_PROJECT
-    old = os.path.normpath(os.path.join(root, req.old_path))
-    new = os.path.normpath(os.path.join(root, req.new_path))
-    if not old.startswith(os.path.normpath(root)) or not new.startswith(os.path.normpath(root)):
-        raise HTTPException(403, "Path traversal blocked")
+    old = _safe_join(req.old_path)
+    new = _safe_join(req.new_path)
     if not os.path.exists(old):
         raise HTTPException(404, "File not found")
     os.makedirs(os.path.dirname(new), exist_ok=True)
@@ -428,10 +606,7 @@ async def rename_file(req: RenameRequest):
 
 @app.post("/file/delete")
 async def delete_file(req: DeleteRequest):
-    root = _project_root or SAMPLE_PROJECT
-    full = os.path.normpath(os.path.join(root, req.path))
-    if not full.startswith(os.path.normpath(root)):
-        raise HTTPException(403, "Path traversal blocked")
+    full = _safe_join(req.path)
     if not os.path.exists(full):
         raise HTTPException(404, "Not found")
     if os.path.isdir(full):
@@ -449,19 +624,44 @@ async def delete_file(req: DeleteRequest):
 async def run_python(path: str = Query(...)):
     """Run a Python file and return stdout/stderr."""
     root = _project_root or SAMPLE_PROJECT
-    full = os.path.normpath(os.path.join(root, path))
-    if not full.startswith(os.path.normpath(root)):
-        raise HTTPException(403, "Path traversal blocked")
+    full = _safe_join(path)
     if not os.path.isfile(full):
         raise HTTPException(404, "File not found")
 
     try:
-        result = subprocess.run(
+        proc = await asyncio.create_subprocess_exec(
             # FIX: Use sys.executable instead of the bare "python" string.
             # "python" may not be on PATH on all platforms (especially Linux/macOS
             # where the binary is "python3"). sys.executable always points to the
             # exact interpreter that is running this server, guaranteeing the same
             # environment, installed packages, and Python version are used.
+            sys.executable, str(full),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=root,
+        )
+    except NotImplementedError:
+        # The Windows selector loop (uvicorn --reload) has no subprocess support
+        return await anyio.to_thread.run_sync(_run_blocking, full, root)
+    except Exception as e:
+        return {"stdout": "", "stderr": str(e), "returncode": -1}
+
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(), timeout=30)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return {"stdout": "", "stderr": "Execution timed out (30s limit)", "returncode": -1}
+    return {
+        "stdout": out.decode("utf-8", errors="replace"),
+        "stderr": err.decode("utf-8", errors="replace"),
+        "returncode": proc.returncode,
+    }
+
+
+def _run_blocking(full: Path, root: str) -> dict:
+    try:
+        result = subprocess.run(
             [sys.executable, full],
             capture_output=True,
             text=True,
@@ -483,18 +683,211 @@ async def run_python(path: str = Query(...)):
 # Endpoints — Visualize execution flow
 # ---------------------------------------------------------------------------
 
+# Node handlers for /visualize, dispatched on exact node type via _VIZ_HANDLERS
+
+class _VizCtx:
+    """Per-request state shared by the /visualize node handlers."""
+    __slots__ = ("path", "add_step", "walk")
+
+    def __init__(self, path, add_step, walk):
+        self.path = path
+        self.add_step = add_step
+        self.walk = walk
+
+
+def _h_module(node, parent_id, ctx):
+    sid = ctx.add_step("start", os.path.basename(ctx.path), "Module entry", 1, color="#58a6ff")
+    for child in ast.iter_child_nodes(node):
+        ctx.walk(child, sid)
+
+
+def _h_import(node, parent_id, ctx):
+    names = ", ".join(a.name for a in node.names)
+    ctx.add_step("import", f"import {names}", "", node.lineno, parent_id, "#39d2c0")
+
+
+def _h_import_from(node, parent_id, ctx):
+    names = ", ".join(a.name for a in node.names[:3])
+    mod = node.module or "?"
+    ctx.add_step("import", f"from {mod} import {names}", "", node.lineno, parent_id, "#39d2c0")
+
+
+def _h_function(node, parent_id, ctx):
+    args = ", ".join(a.arg for a in node.args.args[:4])
+    sid = ctx.add_step("define", f"def {node.name}({args})", f"{len(node.body)} stmts", node.lineno, parent_id, "#bc8cff")
+    for child in node.body[:6]:
+        ctx.walk(child, sid)
+
+
+def _h_class(node, parent_id, ctx):
+    bases = ", ".join(getattr(b, 'id', '?') for b in node.bases[:2])
+    sid = ctx.add_step("class", f"class {node.name}" + (f"({bases})" if bases else ""),
+                       f"{len(node.body)} members", node.lineno, parent_id, "#d29922")
+    for child in node.body[:5]:
+        ctx.walk(child, sid)
+
+
+def _h_assign(node, parent_id, ctx):
+    targets = ", ".join(getattr(t, 'id', '...') for t in node.targets[:2])
+    if isinstance(node.value, ast.Constant):
+        val = repr(node.value.value)[:25]
+    elif isinstance(node.value, ast.Call):
+        val = getattr(node.value.func, 'id', getattr(node.value.func, 'attr', '?')) + "(...)"
+    else:
+        val = "..."
+    ctx.add_step("assign", f"{targets} = {val}", "", node.lineno, parent_id, "#8b949e")
+
+
+def _h_expr(node, parent_id, ctx):
+    if isinstance(node.value, ast.Call):
+        call = node.value
+        fn = getattr(call.func, 'id', getattr(call.func, 'attr', '?'))
+        ctx.add_step("call", f"{fn}(...)", "function call", node.lineno, parent_id, "#3fb950")
+
+
+def _h_return(node, parent_id, ctx):
+    val = ""
+    if node.value:
+        if isinstance(node.value, ast.Constant):
+            val = repr(node.value.value)[:20]
+        else:
+            val = "..."
+    ctx.add_step("return", f"return {val}" if val else "return", "", node.lineno, parent_id, "#f85149")
+
+
+def _h_if(node, parent_id, ctx):
+    test_str = "condition"
+    if isinstance(node.test, ast.Compare):
+        test_str = getattr(node.test.left, 'id', '?') + " ..."
+    elif isinstance(node.test, ast.Call):
+        test_str = getattr(node.test.func, 'id', '?') + "(...)"
+    elif isinstance(node.test, ast.Name):
+        test_str = node.test.id
+    sid = ctx.add_step("condition", f"if {test_str}", "", node.lineno, parent_id, "#d29922")
+    for child in node.body[:3]:
+        ctx.walk(child, sid)
+    if node.orelse:
+        eid = ctx.add_step("condition", "else", "", node.orelse[0].lineno if node.orelse else node.lineno, sid, "#d29922")
+        for child in node.orelse[:3]:
+            ctx.walk(child, eid)
+
+
+def _h_for(node, parent_id, ctx):
+    target = getattr(node.target, 'id', '?')
+    iter_s = getattr(node.iter, 'id', '...')
+    sid = ctx.add_step("loop", f"for {target} in {iter_s}", "", node.lineno, parent_id, "#f778ba")
+    for child in node.body[:3]:
+        ctx.walk(child, sid)
+
+
+def _h_while(node, parent_id, ctx):
+    sid = ctx.add_step("loop", "while loop", "", node.lineno, parent_id, "#f778ba")
+    for child in node.body[:3]:
+        ctx.walk(child, sid)
+
+
+def _h_try(node, parent_id, ctx):
+    sid = ctx.add_step("condition", "try", "", node.lineno, parent_id, "#d29922")
+    for child in node.body[:3]:
+        ctx.walk(child, sid)
+    for handler in node.handlers[:2]:
+        exc = getattr(handler.type, 'id', 'Exception') if handler.type else 'Exception'
+        hid = ctx.add_step("condition", f"except {exc}", "", handler.lineno, sid, "#f85149")
+        for child in handler.body[:2]:
+            ctx.walk(child, hid)
+
+
+def _h_with(node, parent_id, ctx):
+    sid = ctx.add_step("call", "with ...", "context manager", node.lineno, parent_id, "#39d2c0")
+    for child in node.body[:3]:
+        ctx.walk(child, sid)
+
+
+_VIZ_HANDLERS: dict[type, Callable] = {
+    ast.Module: _h_module,
+    ast.Import: _h_import,
+    ast.ImportFrom: _h_import_from,
+    ast.FunctionDef: _h_function,
+    ast.AsyncFunctionDef: _h_function,
+    ast.ClassDef: _h_class,
+    ast.Assign: _h_assign,
+    ast.Expr: _h_expr,
+    ast.Return: _h_return,
+    ast.If: _h_if,
+    ast.For: _h_for,
+    ast.While: _h_while,
+    ast.Try: _h_try,
+    ast.With: _h_with,
+}
+
+
+_VIZ_CACHE_SIZE = 128
+# LRU of /visualize results keyed by (abs path, request path, mtime_ns, size)
+_viz_cache: OrderedDict[tuple[str, str, int, int], dict] = OrderedDict()
+
+
 @app.post("/visualize")
 async def visualize_file(path: str = Query(...)):
     """Analyze a Python file and return Mermaid flowchart + raw steps."""
-    import ast
-
-    root = _project_root or SAMPLE_PROJECT
-    full = os.path.normpath(os.path.join(root, path))
-    if not full.startswith(os.path.normpath(root)):
-        raise HTTPException(403, "Path traversal blocked")
+    full = _safe_join(path)
     if not os.path.isfile(full):
         raise HTTPException(404, "File not found")
 
+    st = os.stat(full)
+    key = (str(full), path, st.st_mtime_ns, st.st_size)
+    result = _viz_cache.get(key)
+    if result is not None:
+        _viz_cache.move_to_end(key)
+        return result
+
+    # Parsing and walking is CPU-bound — keep it off the event loop
+    result = await anyio.to_thread.run_sync(_build_viz, full, path)
+    _viz_cache[key] = result
+    if len(_viz_cache) > _VIZ_CACHE_SIZE:
+        _viz_cache.popitem(last=False)
+    return result
+
+
+_MERMAID_STYLES = """
+    classDef startStyle fill:#1a3a5c,stroke:#58a6ff,stroke-width:2px,color:#58a6ff
+    classDef importStyle fill:#1a3a3a,stroke:#39d2c0,stroke-width:1px,color:#39d2c0
+    classDef defineStyle fill:#2a1f3a,stroke:#bc8cff,stroke-width:2px,color:#bc8cff
+    classDef classStyle fill:#3a2a1a,stroke:#d29922,stroke-width:2px,color:#d29922
+    classDef assignStyle fill:#1a1f24,stroke:#484f58,stroke-width:1px,color:#8b949e
+    classDef callStyle fill:#1a2f1a,stroke:#3fb950,stroke-width:1px,color:#3fb950
+    classDef conditionStyle fill:#3a2a1a,stroke:#d29922,stroke-width:1px,color:#d29922
+    classDef loopStyle fill:#2a1a2a,stroke:#f778ba,stroke-width:1px,color:#f778ba
+    classDef returnStyle fill:#2a1a1a,stroke:#f85149,stroke-width:1px,color:#f85149
+"""
+
+# Node shape delimiters per step kind — only basic universally-supported shapes
+_SHAPE = {
+    "condition": ('{"', '"}'),
+    "loop": ('(["', '"])'),
+    "define": ('(["', '"])'),
+    "class": ('[["', '"]]'),
+    "return": ('[/"', '"/]'),
+    "start": ('(("', '"))'),
+}
+_DEFAULT_SHAPE = ('["', '"]')
+
+_ESC_TABLE = str.maketrans({
+    '"': "'",
+    '<': "‹", '>': "›",
+    '&': "+",
+    '(': "❨", ')': "❩",
+    '[': "⟦", ']': "⟧",
+    '{': "❴", '}': "❵",
+    '#': "♯",
+})
+
+
+def _esc(text: str) -> str:
+    """Escape text for Mermaid labels — strip ALL shape-conflicting chars."""
+    return text.translate(_ESC_TABLE)
+
+
+def _build_viz(full: Path, path: str) -> dict:
     try:
         with open(full, "r", encoding="utf-8", errors="replace") as f:
             source = f.read()
@@ -504,25 +897,13 @@ async def visualize_file(path: str = Query(...)):
 
     steps = []
     step_id = 0
-    mermaid_lines = ["flowchart TD"]
+    out = ["flowchart TD"]
     mermaid_edges = []
 
-    def _esc(text):
-        """Escape text for Mermaid labels — strip ALL shape-conflicting chars."""
-        return (text
-                .replace('"', "'")
-                .replace('<', "‹").replace('>', "›")
-                .replace('&', "+")
-                .replace('(', "❨").replace(')', "❩")
-                .replace('[', "⟦").replace(']', "⟧")
-                .replace('{', "❴").replace('}', "❵")
-                .replace('#', "♯")
-                )
-
     def add_step(kind, label, detail="", line=0, parent=None, color=None):
         nonlocal step_id
         step_id += 1
-        sid = f"n{step_id}"
+        sid = "n" + str(step_id)
         steps.append({
             "id": step_id, "sid": sid, "kind": kind,
             "label": label, "detail": detail,
@@ -534,144 +915,28 @@ async def visualize_file(path: str = Query(...)):
         line_str = f"  L{line}" if line else ""
         full_label = f"{esc_label}{line_str}"
 
-        # Use only basic universally-supported Mermaid shapes
-        if kind == "condition":
-            mermaid_lines.append(f'    {sid}{{"{full_label}"}}')
-        elif kind == "loop":
-            mermaid_lines.append(f'    {sid}(["{full_label}"])')
-        elif kind == "define":
-            mermaid_lines.append(f'    {sid}(["{full_label}"])')
-        elif kind == "class":
-            mermaid_lines.append(f'    {sid}[["{full_label}"]]')
-        elif kind == "return":
-            mermaid_lines.append(f'    {sid}[/"{full_label}"/]')
-        elif kind == "start":
-            mermaid_lines.append(f'    {sid}(("{full_label}"))')
-        else:
-            mermaid_lines.append(f'    {sid}["{full_label}"]')
-
-        # Style class
-        mermaid_lines.append(f'    class {sid} {kind}Style')
+        # Node shape plus inline style class (Mermaid's ":::" syntax)
+        open_, close_ = _SHAPE.get(kind, _DEFAULT_SHAPE)
+        out.append(f"    {sid}{open_}{full_label}{close_}:::{kind}Style")
 
         # Edge from parent
         if parent:
-            parent_sid = f"n{parent}"
+            parent_sid = "n" + str(parent)
             mermaid_edges.append(f"    {parent_sid} --> {sid}")
 
         return step_id
 
     def walk(node, parent_id=None):
-        if isinstance(node, ast.Module):
-            sid = add_step("start", os.path.basename(path), "Module entry", 1, color="#58a6ff")
-            for child in ast.iter_child_nodes(node):
-                walk(child, sid)
-
-        elif isinstance(node, ast.Import):
-            names = ", ".join(a.name for a in node.names)
-            add_step("import", f"import {names}", "", node.lineno, parent_id, "#39d2c0")
-
-        elif isinstance(node, ast.ImportFrom):
-            names = ", ".join(a.name for a in node.names[:3])
-            mod = node.module or "?"
-            add_step("import", f"from {mod} import {names}", "", node.lineno, parent_id, "#39d2c0")
-
-        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            args = ", ".join(a.arg for a in node.args.args[:4])
-            sid = add_step("define", f"def {node.name}({args})", f"{len(node.body)} stmts", node.lineno, parent_id, "#bc8cff")
-            for child in node.body[:6]:
-                walk(child, sid)
-
-        elif isinstance(node, ast.ClassDef):
-            bases = ", ".join(getattr(b, 'id', '?') for b in node.bases[:2])
-            sid = add_step("class", f"class {node.name}" + (f"({bases})" if bases else ""),
-                          f"{len(node.body)} members", node.lineno, parent_id, "#d29922")
-            for child in node.body[:5]:
-                walk(child, sid)
-
-        elif isinstance(node, ast.Assign):
-            targets = ", ".join(getattr(t, 'id', '...') for t in node.targets[:2])
-            if isinstance(node.value, ast.Constant):
-                val = repr(node.value.value)[:25]
-            elif isinstance(node.value, ast.Call):
-                val = getattr(node.value.func, 'id', getattr(node.value.func, 'attr', '?')) + "(...)"
-            else:
-                val = "..."
-            add_step("assign", f"{targets} = {val}", "", node.lineno, parent_id, "#8b949e")
-
-        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
-            call = node.value
-            fn = getattr(call.func, 'id', getattr(call.func, 'attr', '?'))
-            add_step("call", f"{fn}(...)", "function call", node.lineno, parent_id, "#3fb950")
-
-        elif isinstance(node, ast.Return):
-            val = ""
-            if node.value:
-                if isinstance(node.value, ast.Constant):
-                    val = repr(node.value.value)[:20]
-                else:
-                    val = "..."
-            add_step("return", f"return {val}" if val else "return", "", node.lineno, parent_id, "#f85149")
-
-        elif isinstance(node, ast.If):
-            test_str = "condition"
-            if isinstance(node.test, ast.Compare):
-                test_str = getattr(node.test.left, 'id', '?') + " ..."
-            elif isinstance(node.test, ast.Call):
-                test_str = getattr(node.test.func, 'id', '?') + "(...)"
-            elif isinstance(node.test, ast.Name):
-                test_str = node.test.id
-            sid = add_step("condition", f"if {test_str}", "", node.lineno, parent_id, "#d29922")
-            for child in node.body[:3]:
-                walk(child, sid)
-            if node.orelse:
-                eid = add_step("condition", "else", "", node.orelse[0].lineno if node.orelse else node.lineno, sid, "#d29922")
-                for child in node.orelse[:3]:
-                    walk(child, eid)
-
-        elif isinstance(node, ast.For):
-            target = getattr(node.target, 'id', '?')
-            iter_s = getattr(node.iter, 'id', '...')
-            sid = add_step("loop", f"for {target} in {iter_s}", "", node.lineno, parent_id, "#f778ba")
-            for child in node.body[:3]:
-                walk(child, sid)
-
-        elif isinstance(node, ast.While):
-            sid = add_step("loop", "while loop", "", node.lineno, parent_id, "#f778ba")
-            for child in node.body[:3]:
-                walk(child, sid)
-
-        elif isinstance(node, ast.Try):
-            sid = add_step("condition", "try", "", node.lineno, parent_id, "#d29922")
-            for child in node.body[:3]:
-                walk(child, sid)
-            for handler in node.handlers[:2]:
-                exc = getattr(handler.type, 'id', 'Exception') if handler.type else 'Exception'
-                hid = add_step("condition", f"except {exc}", "", handler.lineno, sid, "#f85149")
-                for child in handler.body[:2]:
-                    walk(child, hid)
-
-        elif isinstance(node, ast.With):
-            sid = add_step("call", "with ...", "context manager", node.lineno, parent_id, "#39d2c0")
-            for child in node.body[:3]:
-                walk(child, sid)
+        handler = _VIZ_HANDLERS.get(type(node))
+        if handler is not None:
+            handler(node, parent_id, ctx)
 
+    ctx = _VizCtx(path, add_step, walk)
     walk(tree)
 
-    # Build final Mermaid string
-    mermaid_str = "\n".join(mermaid_lines + mermaid_edges)
-
-    # Add style classes
-    mermaid_str += """
-    classDef startStyle fill:#1a3a5c,stroke:#58a6ff,stroke-width:2px,color:#58a6ff
-    classDef importStyle fill:#1a3a3a,stroke:#39d2c0,stroke-width:1px,color:#39d2c0
-    classDef defineStyle fill:#2a1f3a,stroke:#bc8cff,stroke-width:2px,color:#bc8cff
-    classDef classStyle fill:#3a2a1a,stroke:#d29922,stroke-width:2px,color:#d29922
-    classDef assignStyle fill:#1a1f24,stroke:#484f58,stroke-width:1px,color:#8b949e
-    classDef callStyle fill:#1a2f1a,stroke:#3fb950,stroke-width:1px,color:#3fb950
-    classDef conditionStyle fill:#3a2a1a,stroke:#d29922,stroke-width:1px,color:#d29922
-    classDef loopStyle fill:#2a1a2a,stroke:#f778ba,stroke-width:1px,color:#f778ba
-    classDef returnStyle fill:#2a1a1a,stroke:#f85149,stroke-width:1px,color:#f85149
-"""
+    # Build final Mermaid string: nodes, then edges, then style classes
+    out.extend(mermaid_edges)
+    mermaid_str = "\n".join(out) + _MERMAID_STYLES
 
     edges = [{"from": s["parent"], "to": s["id"]} for s in steps if s["parent"]]
 
@@ -687,13 +952,64 @@ async def visualize_file(path: str = Query(...)):
 # WebSocket — Integrated Terminal
 # ---------------------------------------------------------------------------
 
+_TERM_COALESCE = 0.008  # seconds of shell output batched into one WebSocket send
+
+
+class _TerminalProto(asyncio.Protocol):
+    """Decode shell output incrementally and coalesce it into few WebSocket sends."""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.pending: list[str] = []
+        self.ready = asyncio.Event()
+        self.eof = False
+
+    def data_received(self, data: bytes):
+        text = self._decoder.decode(data)
+        if text:
+            self.pending.append(text)
+            self.ready.set()
+
+    def connection_lost(self, exc):
+        tail = self._decoder.decode(b"", final=True)
+        if tail:
+            self.pending.append(tail)
+        self.eof = True
+        self.ready.set()
+
+    async def pump(self, websocket: WebSocket):
+        """Forward buffered output to the socket until the pipe closes."""
+        try:
+            while True:
+                await self.ready.wait()
+                await asyncio.sleep(_TERM_COALESCE)
+                self.ready.clear()
+                if self.pending:
+                    text = "".join(self.pending)
+                    self.pending.clear()
+                    await websocket.send_text(text)
+                if self.eof and not self.pending:
+                    return
+        except Exception:
+            pass
+
+
+async def _read_pipe_blocking(fd: int, proto: _TerminalProto):
+    """Chunked reads on the default executor, for loops without pipe transports."""
+    loop = asyncio.get_running_loop()
+    while True:
+        data = await loop.run_in_executor(None, os.read, fd, 4096)
+        if not data:
+            break
+        proto.data_received(data)
+    proto.connection_lost(None)
+
+
 @app.websocket("/ws/terminal")
 async def terminal_ws(websocket: WebSocket):
     await websocket.accept()
     root = _project_root or SAMPLE_PROJECT
 
-    import threading
-
     shell = "cmd.exe" if sys.platform == "win32" else "/bin/bash"
 
     try:
@@ -711,36 +1027,15 @@ async def terminal_ws(websocket: WebSocket):
         await websocket.close()
         return
 
-    closed = threading.Event()
-
-    # FIX: Capture the running event loop HERE, in the async context, before
-    # the thread starts. In Python 3.10+, calling asyncio.get_event_loop()
-    # from inside a plain thread (with no running loop) raises:
-    #   RuntimeError: There is no current event loop in thread '...'
-    # asyncio.get_running_loop() correctly returns the loop that is driving
-    # this coroutine and is safe to pass into run_coroutine_threadsafe().
-    loop = asyncio.get_running_loop()
-
-    def read_stdout():
-        """Read process output in a thread and send via WebSocket."""
-        try:
-            while not closed.is_set():
-                data = proc.stdout.read(1)
-                if not data:
-                    break
-                try:
-                    text = data.decode("utf-8", errors="replace")
-                    asyncio.run_coroutine_threadsafe(
-                        websocket.send_text(text),
-                        loop  # use the pre-captured loop reference
-                    )
-                except Exception:
-                    break
-        except Exception:
-            pass
-
-    reader_thread = threading.Thread(target=read_stdout, daemon=True)
-    reader_thread.start()
+    proto = _TerminalProto()
+    transport = reader = None
+    if sys.platform == "win32":
+        # Popen's anonymous pipes are not overlapped, so the Proactor loop
+        # cannot wrap them — read them on the executor instead.
+        reader = asyncio.create_task(_read_pipe_blocking(proc.stdout.fileno(), proto))
+    else:
+        transport, _ = await asyncio.get_running_loop().connect_read_pipe(lambda: proto, proc.stdout)
+    pump = asyncio.create_task(proto.pump(websocket))
 
     try:
         while True:
@@ -753,11 +1048,18 @@ async def terminal_ws(websocket: WebSocket):
     except Exception:
         pass
     finally:
-        closed.set()
+        pump.cancel()
+        if reader is not None:
+            reader.cancel()
+        if transport is not None:
+            transport.close()
         try:
             proc.kill()
         except Exception:
             pass
+        if reader is not None:
+            # Collect the reader's outcome so a failed os.read isn't left unretrieved
+            await asyncio.gather(reader, return_exceptions=True)
 
 
 # ---------------------------------------------------------------------------
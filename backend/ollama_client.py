@@ -5,7 +5,8 @@ All calls stay on‑device; no cloud keys needed.
 
 import httpx
 import json
-from typing import Optional
+import time
+from typing import AsyncIterator, Optional
 
 OLLAMA_BASE = "http://localhost:11434"
 DEFAULT_MODEL = "llama3.1:8b"
@@ -18,67 +19,102 @@ SYSTEM_PROMPT = (
     "unfamiliar legacy code. Use markdown formatting for readability."
 )
 
-_cached_model = None
+_MODEL_TTL = 300.0      # seconds a resolved model name stays valid
+_MODEL_MISS_TTL = 10.0  # shorter, so a freshly started Ollama is picked up soon
+_model_cache: dict[str, tuple[float, str]] = {}  # requested -> (expires_at, resolved)
+_http: httpx.AsyncClient | None = None
+
+
+def _client() -> httpx.AsyncClient:
+    """Shared client so keep-alive connections to Ollama are reused."""
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(
+            base_url=OLLAMA_BASE,
+            timeout=120.0,
+            limits=httpx.Limits(max_keepalive_connections=4),
+        )
+    return _http
+
+
+async def aclose():
+    """Close the shared client (called on app shutdown)."""
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+
 
 async def _get_model(model: str) -> str:
     """Return the requested model, or auto-detect from available models."""
-    global _cached_model
-    if _cached_model:
-        return _cached_model
+    now = time.monotonic()
+    hit = _model_cache.get(model)
+    if hit is not None and now < hit[0]:
+        return hit[1]
+    resolved = None
     # Try to verify the model exists
     try:
         models = await list_models()
         if model in models:
-            _cached_model = model
-            return model
-        # Try common prefixes
-        for m in models:
-            if m.startswith(model.split(":")[0]):
-                _cached_model = m
-                return m
-        # Fall back to first available
-        if models:
-            _cached_model = models[0]
-            return models[0]
+            resolved = model
+        else:
+            # Try common prefixes, then fall back to first available
+            prefix = model.split(":")[0]
+            resolved = next((m for m in models if m.startswith(prefix)),
+                            models[0] if models else None)
     except Exception:
         pass
-    return model
+    if resolved is None:
+        # Negative result (Ollama down or no models) — remember it briefly
+        _model_cache[model] = (now + _MODEL_MISS_TTL, model)
+        return model
+    _model_cache[model] = (now + _MODEL_TTL, resolved)
+    return resolved
 
 
-async def generate(prompt: str, model: str = DEFAULT_MODEL,
-                   system: Optional[str] = None) -> str:
-    """Stream-less generation — waits for the full response."""
+async def generate_stream(prompt: str, model: str = DEFAULT_MODEL,
+                          system: Optional[str] = None) -> AsyncIterator[str]:
+    """Yield response text chunks as Ollama produces them."""
     system = system or SYSTEM_PROMPT
     actual_model = await _get_model(model)
     payload = {
         "model": actual_model,
         "prompt": prompt,
         "system": system,
-        "stream": False,
+        "stream": True,
         "options": {
             "temperature": 0.3,
             "num_predict": 2048,
         },
     }
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        try:
-            resp = await client.post(f"{OLLAMA_BASE}/api/generate", json=payload)
+    try:
+        async with _client().stream("POST", "/api/generate", json=payload) as resp:
             resp.raise_for_status()
-            return resp.json().get("response", "")
-        except httpx.ConnectError:
-            return ("⚠️ Could not connect to Ollama. Make sure it is running "
-                    "(`ollama serve`) on port 11434.")
-        except Exception as e:
-            return f"⚠️ Ollama error: {str(e)}"
+            # Ollama streams one JSON object per line
+            async for line in resp.aiter_lines():
+                if line:
+                    chunk = json.loads(line).get("response", "")
+                    if chunk:
+                        yield chunk
+    except httpx.ConnectError:
+        yield ("⚠️ Could not connect to Ollama. Make sure it is running "
+               "(`ollama serve`) on port 11434.")
+    except Exception as e:
+        yield f"⚠️ Ollama error: {str(e)}"
+
+
+async def generate(prompt: str, model: str = DEFAULT_MODEL,
+                   system: Optional[str] = None) -> str:
+    """Convenience wrapper — collects the streamed response into one string."""
+    return "".join([chunk async for chunk in generate_stream(prompt, model, system)])
 
 
 async def list_models() -> list[str]:
     """Return a list of locally‑available model names."""
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            resp = await client.get(f"{OLLAMA_BASE}/api/tags")
-            resp.raise_for_status()
-            models = resp.json().get("models", [])
-            return [m["name"] for m in models]
-        except Exception:
-            return []
+    try:
+        resp = await _client().get("/api/tags", timeout=10.0)
+        resp.raise_for_status()
+        models = resp.json().get("models", [])
+        return [m["name"] for m in models]
+    except Exception:
+        return []
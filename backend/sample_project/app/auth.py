@@ -5,61 +5,161 @@ Handles password hashing, JWT token creation, and login/register flows.
 
 import hashlib
 import hmac
+import os
 import time
 import json
-import base64
+from functools import lru_cache
 
 from app.database import query, execute
 from config import SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRY_MINUTES
 
+_Q_USER_BY_USERNAME = (
+    "SELECT id, username, email, password_hash, is_admin FROM users WHERE username = ?"
+)
+_Q_USER_BY_ID = "SELECT * FROM users WHERE id = ?"
+_SQL_INSERT_USER = "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)"
+_SQL_SET_HASH = "UPDATE users SET password_hash = ? WHERE id = ?"
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps  # returns bytes directly
+    _json_loads = orjson.loads
+except ImportError:  # stdlib fallback
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    _json_loads = json.loads
+
+try:
+    import pybase64 as _base64  # SIMD codec, same API as the stdlib module
+except ImportError:
+    import base64 as _base64
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    _ph = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+except ImportError:  # argon2-cffi not installed — fall back to stdlib scrypt
+    _ph = None
+
+
+# --------------- Password hashing (Argon2id, scrypt fallback) ------------
+
+_SCRYPT_N, _SCRYPT_R, _SCRYPT_P = 2 ** 14, 8, 1
+_HEX = frozenset("0123456789abcdef")
 
-# --------------- Password hashing (legacy MD5 — intentionally weak) -------
 
 def hash_password(plain: str) -> str:
-    """Hash a password with a static salt — legacy, insecure, do not copy."""
-    salted = f"legacy_salt_{plain}_pepper"
-    return hashlib.md5(salted.encode()).hexdigest()
+    """Hash a password with a per-password random salt (Argon2id or scrypt)."""
+    if _ph is not None:
+        return _ph.hash(plain)
+    salt = os.urandom(16)
+    dk = hashlib.scrypt(plain.encode(), salt=salt, n=_SCRYPT_N, r=_SCRYPT_R, p=_SCRYPT_P)
+    return f"scrypt${_SCRYPT_N}${_SCRYPT_R}${_SCRYPT_P}${salt.hex()}${dk.hex()}"
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return hmac.compare_digest(hash_password(plain), hashed)
+    if _is_legacy_md5(hashed):
+        return hmac.compare_digest(_legacy_md5(plain), hashed)
+    if hashed.startswith("scrypt$"):
+        try:
+            _, n, r, p, salt, dk = hashed.split("$")
+            calc = hashlib.scrypt(plain.encode(), salt=bytes.fromhex(salt),
+                                  n=int(n), r=int(r), p=int(p))
+        except ValueError:
+            return False
+        return hmac.compare_digest(calc.hex(), dk)
+    if _ph is None:
+        return False
+    try:
+        return _ph.verify(hashed, plain)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True if a stored hash should be upgraded after a successful login."""
+    if _is_legacy_md5(hashed):
+        return True
+    if hashed.startswith("scrypt$"):
+        return _ph is not None
+    return _ph is not None and _ph.check_needs_rehash(hashed)
+
+
+def _is_legacy_md5(hashed: str) -> bool:
+    return len(hashed) == 32 and _HEX.issuperset(hashed)
+
+
+def _legacy_md5(plain: str) -> str:
+    """Old static-salt MD5 scheme — only used to verify un-migrated rows."""
+    salted = f"legacy_salt_{plain}_pepper"
+    return hashlib.md5(salted.encode()).hexdigest()
 
 
 # --------------- JWT‑like tokens (simplified) -----------------------------
 
 def _b64(data: bytes) -> str:
-    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+    return _base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+_SECRET_BYTES = SECRET_KEY.encode()
+_HEADER_B64 = _b64(_json_dumps({"alg": "HS256", "typ": "JWT"}))
 
 
-def create_token(user_id: int, username: str) -> str:
+def _sign(signing_input: str) -> bytes:
+    """HMAC-SHA256 via the one-shot C helper (no Python HMAC object)."""
+    return hmac.digest(_SECRET_BYTES, signing_input.encode(), "sha256")
+
+
+def create_token(user_id: int, username: str, email: str = "", is_admin: bool = False) -> str:
     """Create a simple signed token (not real JWT, hackathon quality)."""
-    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    header = _HEADER_B64
     payload_data = {
         "sub": user_id,
         "name": username,
+        "email": email,
+        "adm": bool(is_admin),
         "exp": int(time.time()) + JWT_EXPIRY_MINUTES * 60,
     }
-    payload = _b64(json.dumps(payload_data).encode())
-    sig = hmac.new(SECRET_KEY.encode(), f"{header}.{payload}".encode(), hashlib.sha256).hexdigest()
+    payload = _b64(_json_dumps(payload_data))
+    sig = _sign(f"{header}.{payload}").hex()
     return f"{header}.{payload}.{sig}"
 
 
+@lru_cache(maxsize=4096)
+def _decode_cached(token: str) -> tuple[float, dict] | None:
+    """Signature check + payload decode, memoized per token string.
+
+    Expiry and the token's shape are checked by the caller, so expiry is
+    never frozen into the cache and malformed junk never occupies a slot.
+    """
+    header, payload, sig = token.split(".")
+    expected = _sign(f"{header}.{payload}")
+    if not hmac.compare_digest(expected, bytes.fromhex(sig)):
+        return None
+    try:
+        data = _json_loads(_base64.urlsafe_b64decode(payload + "=="))
+    except Exception:
+        return None
+    return data.get("exp", 0), data
+
+
 def decode_token(token: str) -> dict | None:
     """Verify and decode the token. Returns None if invalid."""
     parts = token.split(".")
     if len(parts) != 3:
         return None
-    header, payload, sig = parts
-    expected_sig = hmac.new(SECRET_KEY.encode(), f"{header}.{payload}".encode(), hashlib.sha256).hexdigest()
-    if not hmac.compare_digest(sig, expected_sig):
+    _, payload, sig = parts
+    # Cheap shape checks before the cache: a SHA-256 hex signature, and a
+    # payload length that unpadded base64 can actually produce.
+    if len(sig) != 64 or not _HEX.issuperset(sig) or len(payload) % 4 == 1:
         return None
-    try:
-        data = json.loads(base64.urlsafe_b64decode(payload + "=="))
-    except Exception:
-        return None
-    if data.get("exp", 0) < time.time():
+    hit = _decode_cached(token)
+    if hit is None or hit[0] < time.time():
         return None
-    return data
+    return hit[1]
+
+
+decode_token.cache_clear = _decode_cached.cache_clear
 
 
 # --------------- High‑level auth flows -----------------------------------
@@ -67,32 +167,42 @@ def decode_token(token: str) -> dict | None:
 def register_user(username: str, email: str, password: str) -> int:
     """Create a new user account. Returns user id."""
     pw_hash = hash_password(password)
-    uid = execute(
-        "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
-        (username, email, pw_hash),
-    )
+    uid = execute(_SQL_INSERT_USER, (username, email, pw_hash))
     _send_welcome_email(email, username)
     return uid
 
 
 def login_user(username: str, password: str) -> str | None:
     """Validate credentials and return a token, or None on failure."""
-    user = query(
-        "SELECT * FROM users WHERE username = ?", (username,), one=True
-    )
+    user = query(_Q_USER_BY_USERNAME, (username,), one=True, as_dict=False)
     if not user:
         return None
     if not verify_password(password, user["password_hash"]):
         return None
-    return create_token(user["id"], user["username"])
+    if needs_rehash(user["password_hash"]):
+        # Transparently upgrade legacy MD5 / outdated parameters
+        execute(_SQL_SET_HASH, (hash_password(password), user["id"]))
+    return create_token(user["id"], user["username"], user["email"], user["is_admin"])
 
 
 def get_current_user(token: str) -> dict | None:
-    """Decode token and fetch the user row."""
+    """Decode token and fetch the user row.
+
+    Use this where fresh account state matters (profile, admin checks);
+    routes that only need the id or email should use get_current_user_claims.
+    """
     data = decode_token(token)
     if data is None:
         return None
-    return query("SELECT * FROM users WHERE id = ?", (data["sub"],), one=True)
+    return query(_Q_USER_BY_ID, (data["sub"],), one=True)
+
+
+def get_current_user_claims(token: str) -> dict | None:
+    """Decode token and return its claims (sub, name, email, adm) — no DB hit.
+
+    The dict is shared with the decode cache, so treat it as read-only.
+    """
+    return decode_token(token)
 
 
 # --------------- Helpers --------------------------------------------------
@@ -3,21 +3,42 @@ Database helpers — wraps SQLite via raw SQL for "legacy" flavour.
 """
 
 import sqlite3
+import threading
+from contextlib import contextmanager
 from config import DATABASE_URL
 
 
-_conn = None
+_tls = threading.local()
+_init_lock = threading.Lock()
+_tables_ready = False
+_has_fts = False  # set by _init_tables when SQLite was built with FTS5
 
 
 def get_connection():
-    """Return a shared DB connection (not thread‑safe, it's legacy!)."""
-    global _conn
-    if _conn is None:
+    """Return this thread's DB connection, opening it on first use.
+
+    WAL lets readers run alongside a writer; autocommit mode means
+    multi-statement work goes through transaction() explicitly.
+    """
+    global _tables_ready
+    conn = getattr(_tls, "conn", None)
+    if conn is None:
         db_path = DATABASE_URL.replace("sqlite:///", "")
-        _conn = sqlite3.connect(db_path, check_same_thread=False)
-        _conn.row_factory = sqlite3.Row
-        _init_tables(_conn)
-    return _conn
+        # A larger prepared-statement cache than the default 128, so the
+        # routes' SQL constants are parsed once per connection.
+        conn = sqlite3.connect(db_path, isolation_level=None, cached_statements=256)
+        conn.executescript(
+            "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; "
+            "PRAGMA temp_store=MEMORY; PRAGMA mmap_size=268435456; "
+            "PRAGMA cache_size=-20000;"
+        )
+        conn.row_factory = sqlite3.Row
+        with _init_lock:
+            if not _tables_ready:
+                _init_tables(conn)
+                _tables_ready = True
+        _tls.conn = conn
+    return conn
 
 
 def _init_tables(conn):
@@ -53,16 +74,71 @@ def _init_tables(conn):
             quantity INTEGER NOT NULL,
             unit_price REAL NOT NULL
         );
+
+        CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
+        CREATE INDEX IF NOT EXISTS idx_products_name_nocase ON products(name COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_orders_user_created ON orders(user_id, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id);
     """)
+    _init_fts(conn)
     conn.commit()
 
 
-def query(sql, params=(), one=False):
-    """Execute a SELECT and return rows as dicts."""
+def _init_fts(conn):
+    """Full-text index over product name/description, kept in sync by triggers."""
+    global _has_fts
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'products_fts'"
+    ).fetchone()
+    try:
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                name, description, content='products', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+                INSERT INTO products_fts(rowid, name, description)
+                VALUES (new.id, new.name, new.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, name, description)
+                VALUES ('delete', old.id, old.name, old.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, name, description)
+                VALUES ('delete', old.id, old.name, old.description);
+                INSERT INTO products_fts(rowid, name, description)
+                VALUES (new.id, new.name, new.description);
+            END;
+        """)
+    except sqlite3.OperationalError:
+        return  # no FTS5 in this SQLite build — search falls back to LIKE
+    if not existed:
+        # Index rows that were inserted before the FTS table existed
+        conn.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+    _has_fts = True
+
+
+def has_fts() -> bool:
+    """Whether products_fts is available (initialises the DB if needed)."""
+    get_connection()
+    return _has_fts
+
+
+def query(sql, params=(), one=False, as_dict=True):
+    """Execute a SELECT and return rows as dicts.
+
+    as_dict=False returns the sqlite3.Row objects untouched, for callers
+    that only read columns by name and never hand the rows back out.
+    """
     conn = get_connection()
     cur = conn.execute(sql, params)
-    rows = [dict(r) for r in cur.fetchall()]
-    return rows[0] if one and rows else rows
+    if one:
+        row = cur.fetchone()
+        if row is None:
+            return []
+        return dict(row) if as_dict else row
+    rows = cur.fetchall()
+    return [dict(r) for r in rows] if as_dict else rows
 
 
 def execute(sql, params=()):
@@ -71,3 +147,25 @@ def execute(sql, params=()):
     cur = conn.execute(sql, params)
     conn.commit()
     return cur.lastrowid
+
+
+def execute_many(sql, seq_params):
+    """Execute one statement for every parameter tuple in a single commit."""
+    with transaction() as conn:
+        return conn.executemany(sql, seq_params).rowcount
+
+
+@contextmanager
+def transaction():
+    """Run a block atomically under one write lock; yields the connection.
+
+    Commits once on success (one fsync), rolls back on any exception.
+    """
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
@@ -4,6 +4,8 @@ A simple WSGI‑style app that routes requests to handlers.
 (This is intentionally old‑school for demo purposes.)
 """
 
+import inspect
+
 from app.routes.users import (
     handle_register, handle_login, handle_profile, handle_list_users,
 )
@@ -32,29 +34,51 @@ ROUTES = {
 }
 
 
+_MAX_PER_PAGE = 100
+# Keeps the (page - 1) * per_page OFFSET inside SQLite's 64-bit INTEGER
+_MAX_PAGE = (2 ** 63 - 1) // _MAX_PER_PAGE
+
+
+def _int_arg(data, key, default):
+    """Integer request parameter; missing or malformed values use *default*."""
+    try:
+        return int((data or {}).get(key, default))
+    except (TypeError, ValueError, OverflowError):  # OverflowError: int(inf)
+        return default
+
+
+# How each injectable argument is derived from (data, token)
+_ARG_SOURCES = {
+    "data": lambda data, token: data or {},
+    "token": lambda data, token: token or "",
+    "category": lambda data, token: (data or {}).get("category"),
+    "q": lambda data, token: (data or {}).get("q", ""),
+    "page": lambda data, token: min(max(_int_arg(data, "page", 1), 1), _MAX_PAGE),
+    "per_page": lambda data, token: min(max(_int_arg(data, "per_page", 20), 1), _MAX_PER_PAGE),
+}
+
+
+def _bind(handler):
+    """Specialize *handler* once: inspect its signature at import, not per request."""
+    getters = [(name, get) for name, get in _ARG_SOURCES.items()
+               if name in inspect.signature(handler).parameters]
+
+    def call(data, token):
+        return handler(**{name: get(data, token) for name, get in getters})
+    return call
+
+
+_DISPATCH = {key: _bind(handler) for key, handler in ROUTES.items()}
+
+
 def dispatch(method: str, path: str, data: dict = None, token: str = None):
     """
     Ghetto router — matches method + path to a handler.
     """
-    key = f"{method.upper()} {path}"
-    handler = ROUTES.get(key)
-    if handler is None:
+    call = _DISPATCH.get(f"{method.upper()} {path}")
+    if call is None:
         return {"error": "Not found", "status": 404}
-
-    # Inject the right args based on handler expectations
-    import inspect
-    sig = inspect.signature(handler)
-    kwargs = {}
-    if "data" in sig.parameters:
-        kwargs["data"] = data or {}
-    if "token" in sig.parameters:
-        kwargs["token"] = token or ""
-    if "category" in sig.parameters:
-        kwargs["category"] = (data or {}).get("category")
-    if "q" in sig.parameters:
-        kwargs["q"] = (data or {}).get("q", "")
-
-    return handler(**kwargs)
+    return call(data, token)
 
 
 def main():
@@ -65,7 +89,7 @@ def main():
 
     # Seed a test product
     from app.database import execute, query
-    if not query("SELECT id FROM products LIMIT 1"):
+    if not query("SELECT id FROM products LIMIT 1", as_dict=False):
         execute(
             "INSERT INTO products (name, description, price, stock, category) "
             "VALUES (?, ?, ?, ?, ?)",
@@ -2,10 +2,19 @@
 Data models — plain classes, no ORM (legacy style).
 """
 
+import operator
 from dataclasses import dataclass, field
 from typing import List, Optional
 from datetime import datetime
 
+try:
+    import numpy as np
+except ImportError:  # optional — OrderArrays falls back to plain lists
+    np = None
+
+# Below this many lines NumPy's per-call overhead outweighs the vector win
+_NUMPY_MIN_ITEMS = 64
+
 
 @dataclass
 class User:
@@ -69,3 +78,31 @@ class Order:
             quantity=qty,
             unit_price=product.price,
         ))
+
+
+@dataclass
+class OrderArrays:
+    """Column-wise (SoA) view of order lines for bulk arithmetic.
+
+    Columns are NumPy arrays for large orders when NumPy is installed,
+    plain lists otherwise.
+    """
+    product_ids: list
+    quantities: list
+    unit_prices: list
+
+    @classmethod
+    def from_items(cls, items: list[dict]) -> "OrderArrays":
+        ids = [i["product_id"] for i in items]
+        qty = [i["quantity"] for i in items]
+        price = [i["unit_price"] for i in items]
+        if np is not None and len(items) >= _NUMPY_MIN_ITEMS:
+            return cls(np.asarray(ids, dtype=np.int64),
+                       np.asarray(qty, dtype=np.int64),
+                       np.asarray(price, dtype=np.float64))
+        return cls(ids, qty, price)
+
+    def total(self) -> float:
+        if np is not None and isinstance(self.quantities, np.ndarray):
+            return float(np.dot(self.quantities, self.unit_prices))
+        return float(sum(map(operator.mul, self.quantities, self.unit_prices)))
@@ -2,10 +2,28 @@
 Order routes — checkout, order history, status updates.
 """
 
-from app.database import query, execute
-from app.auth import get_current_user
+from app.database import query, execute, transaction
+from app.auth import get_current_user_claims
 from app.routes.products import handle_update_stock
-from app.models import Order, OrderItem
+from app.models import Order, OrderArrays, OrderItem
+
+_Q_HISTORY = (
+    "SELECT id, total, status, created_at FROM orders WHERE user_id = ? "
+    "ORDER BY created_at DESC LIMIT ? OFFSET ?"
+)
+_Q_ORDER = "SELECT * FROM orders WHERE id = ? AND user_id = ?"
+_Q_ORDER_STATUS = "SELECT status FROM orders WHERE id = ? AND user_id = ?"
+_Q_ITEMS = "SELECT * FROM order_items WHERE order_id = ?"
+_Q_ITEM_QTYS = "SELECT product_id, quantity FROM order_items WHERE order_id = ?"
+_SQL_INSERT_ORDER = "INSERT INTO orders (user_id, total, status) VALUES (?, ?, ?)"
+_SQL_INSERT_ITEM = (
+    "INSERT INTO order_items (order_id, product_id, quantity, unit_price) "
+    "VALUES (?, ?, ?, ?)"
+)
+_SQL_TAKE_STOCK = "UPDATE products SET stock = stock - ? WHERE id = ? AND stock >= ?"
+_SQL_PUT_BACK_STOCK = "UPDATE products SET stock = stock + ? WHERE id = ?"
+_SQL_CONFIRM = "UPDATE orders SET status = 'confirmed' WHERE id = ?"
+_SQL_CANCEL = "UPDATE orders SET status = 'cancelled' WHERE id = ?"
 
 
 # FIX: Changed signature from handle_checkout(token, cart_items) to
@@ -24,7 +42,7 @@ def handle_checkout(token: str, data: dict) -> dict:
     POST /checkout
     data: {"cart_items": [{"product_id": 1, "quantity": 2}, ...]}
     """
-    user = get_current_user(token)
+    user = get_current_user_claims(token)
     if user is None:
         return {"error": "Unauthorized", "status": 401}
 
@@ -33,89 +51,106 @@ def handle_checkout(token: str, data: dict) -> dict:
     if not cart_items:
         return {"error": "Cart is empty", "status": 400}
 
-    # Validate products and calculate total
-    total = 0.0
+    # Validate products and calculate total — one query for the whole cart
+    ids = list({item["product_id"] for item in cart_items})
+    rows = query(
+        f"SELECT id, name, price, stock FROM products WHERE id IN ({','.join('?' * len(ids))})",
+        ids,
+        as_dict=False,
+    )
+    products = {row["id"]: row for row in rows}
     validated_items = []
     for item in cart_items:
-        product = query("SELECT * FROM products WHERE id = ?",
-                        (item["product_id"],), one=True)
+        product = products.get(item["product_id"])
         if not product:
             return {"error": f"Product {item['product_id']} not found", "status": 404}
         if product["stock"] < item["quantity"]:
             return {"error": f"Insufficient stock for {product['name']}", "status": 400}
-        line_total = product["price"] * item["quantity"]
-        total += line_total
         validated_items.append({
             "product_id": product["id"],
             "quantity": item["quantity"],
             "unit_price": product["price"],
         })
-
-    # Process payment (placeholder)
-    payment_ok = _process_payment(user["id"], total)
-    if not payment_ok:
+    # Line totals summed column-wise (vectorized for large carts)
+    total = OrderArrays.from_items(validated_items).total()
+
+    # Reserve: a pending order, its items and the stock decrements in one
+    # short transaction, so a sell-out is caught before anyone is charged
+    try:
+        with transaction() as conn:
+            order_id = conn.execute(
+                _SQL_INSERT_ORDER, (user["sub"], total, "pending"),
+            ).lastrowid
+            conn.executemany(
+                _SQL_INSERT_ITEM,
+                [(order_id, vi["product_id"], vi["quantity"], vi["unit_price"])
+                 for vi in validated_items],
+            )
+            # The stock guard makes a concurrent sell-out roll the whole order back
+            cur = conn.executemany(
+                _SQL_TAKE_STOCK,
+                [(vi["quantity"], vi["product_id"], vi["quantity"]) for vi in validated_items],
+            )
+            if cur.rowcount != len(validated_items):
+                raise _OutOfStock
+    except _OutOfStock:
+        return {"error": "Insufficient stock", "status": 409}
+
+    # Process payment (placeholder) outside the transaction — a gateway call
+    # must not hold SQLite's write lock
+    if not _process_payment(user["sub"], total):
+        # Release the reservation
+        with transaction() as conn:
+            conn.execute(_SQL_CANCEL, (order_id,))
+            conn.executemany(
+                _SQL_PUT_BACK_STOCK,
+                [(vi["quantity"], vi["product_id"]) for vi in validated_items],
+            )
         return {"error": "Payment failed", "status": 402}
+    execute(_SQL_CONFIRM, (order_id,))
 
-    # Create order
-    order_id = execute(
-        "INSERT INTO orders (user_id, total, status) VALUES (?, ?, ?)",
-        (user["id"], total, "confirmed"),
-    )
-
-    # Insert order items and decrement stock
-    for vi in validated_items:
-        execute(
-            "INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES (?, ?, ?, ?)",
-            (order_id, vi["product_id"], vi["quantity"], vi["unit_price"]),
-        )
-        handle_update_stock(vi["product_id"], -vi["quantity"])
-
-    _send_order_confirmation(user["email"], order_id, total)
+    # Tokens minted before the email claim existed simply lack it
+    _send_order_confirmation(user.get("email", ""), order_id, total)
 
     return {"order_id": order_id, "total": total, "status": 201}
 
 
-def handle_order_history(token: str) -> dict:
-    """GET /orders — current user's orders."""
-    user = get_current_user(token)
+def handle_order_history(token: str, page: int = 1, per_page: int = 20) -> dict:
+    """GET /orders — current user's orders, newest first, one page at a time."""
+    user = get_current_user_claims(token)
     if user is None:
         return {"error": "Unauthorized", "status": 401}
-    orders = query(
-        "SELECT * FROM orders WHERE user_id = ? ORDER BY created_at DESC",
-        (user["id"],),
-    )
-    return {"orders": orders, "status": 200}
+    orders = query(_Q_HISTORY, (user["sub"], per_page, (page - 1) * per_page))
+    return {"orders": orders, "page": page, "per_page": per_page, "status": 200}
 
 
 def handle_order_detail(token: str, order_id: int) -> dict:
     """GET /orders/<id>."""
-    user = get_current_user(token)
+    user = get_current_user_claims(token)
     if user is None:
         return {"error": "Unauthorized", "status": 401}
-    order = query("SELECT * FROM orders WHERE id = ? AND user_id = ?",
-                  (order_id, user["id"]), one=True)
+    order = query(_Q_ORDER, (order_id, user["sub"]), one=True)
     if not order:
         return {"error": "Order not found", "status": 404}
-    items = query("SELECT * FROM order_items WHERE order_id = ?", (order_id,))
+    items = query(_Q_ITEMS, (order_id,))
     return {"order": order, "items": items, "status": 200}
 
 
 def handle_cancel_order(token: str, order_id: int) -> dict:
     """POST /orders/<id>/cancel."""
-    user = get_current_user(token)
+    user = get_current_user_claims(token)
     if user is None:
         return {"error": "Unauthorized", "status": 401}
-    order = query("SELECT * FROM orders WHERE id = ? AND user_id = ?",
-                  (order_id, user["id"]), one=True)
+    order = query(_Q_ORDER_STATUS, (order_id, user["sub"]), one=True, as_dict=False)
     if not order:
         return {"error": "Order not found", "status": 404}
     if order["status"] not in ("pending", "confirmed"):
         return {"error": "Cannot cancel order in this state", "status": 400}
 
-    execute("UPDATE orders SET status = 'cancelled' WHERE id = ?", (order_id,))
+    execute(_SQL_CANCEL, (order_id,))
 
     # Refund stock
-    items = query("SELECT * FROM order_items WHERE order_id = ?", (order_id,))
+    items = query(_Q_ITEM_QTYS, (order_id,), as_dict=False)
     for item in items:
         handle_update_stock(item["product_id"], item["quantity"])
 
@@ -124,6 +159,10 @@ def handle_cancel_order(token: str, order_id: int) -> dict:
 
 # --------------- Helpers --------------------------------------------------
 
+class _OutOfStock(Exception):
+    """Raised inside the checkout transaction to roll it back."""
+
+
 def _process_payment(user_id: int, amount: float) -> bool:
     """Placeholder payment processing — always succeeds in dev."""
     # TODO: call config.PAYMENT_GATEWAY_URL
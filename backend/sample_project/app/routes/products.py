@@ -2,33 +2,53 @@
 Product routes — listing, detail, search, admin CRUD.
 """
 
-from app.database import query, execute
+from app.database import query, execute, has_fts
 from app.models import Product
 
+_Q_LIST = (
+    "SELECT id, name, price, stock, category FROM products "
+    "WHERE (? IS NULL OR category = ?) ORDER BY id LIMIT ? OFFSET ?"
+)
+_Q_BY_ID = "SELECT * FROM products WHERE id = ?"
+_Q_SEARCH_FTS = (
+    "SELECT products.* FROM products JOIN products_fts "
+    "ON products.id = products_fts.rowid "
+    "WHERE products_fts MATCH ? ORDER BY products.id"
+)
+_Q_SEARCH_LIKE = "SELECT * FROM products WHERE name LIKE ? OR description LIKE ?"
+_Q_STOCK = "SELECT stock FROM products WHERE id = ?"
+_SQL_INSERT = (
+    "INSERT INTO products (name, description, price, stock, category) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_SQL_SET_STOCK = "UPDATE products SET stock = ? WHERE id = ?"
 
-def handle_list_products(category: str = None) -> dict:
-    """GET /products — optionally filter by category."""
-    if category:
-        rows = query("SELECT * FROM products WHERE category = ?", (category,))
-    else:
-        rows = query("SELECT * FROM products")
-    return {"products": rows, "status": 200}
+
+def handle_list_products(category: str = None, page: int = 1, per_page: int = 20) -> dict:
+    """GET /products — optionally filter by category, one page at a time."""
+    rows = query(
+        _Q_LIST,
+        (category or None, category or None, per_page, (page - 1) * per_page),
+    )
+    return {"products": rows, "page": page, "per_page": per_page, "status": 200}
 
 
 def handle_product_detail(product_id: int) -> dict:
     """GET /products/<id>."""
-    row = query("SELECT * FROM products WHERE id = ?", (product_id,), one=True)
+    row = query(_Q_BY_ID, (product_id,), one=True)
     if not row:
         return {"error": "Product not found", "status": 404}
     return {"product": row, "status": 200}
 
 
 def handle_search(q: str) -> dict:
-    """GET /products/search?q=... — simple LIKE search."""
-    rows = query(
-        "SELECT * FROM products WHERE name LIKE ? OR description LIKE ?",
-        (f"%{q}%", f"%{q}%"),
-    )
+    """GET /products/search?q=... — full-text prefix search (LIKE fallback)."""
+    if q.strip() and has_fts():
+        # Quote the input as one FTS phrase; trailing * makes it a prefix match
+        phrase = '"' + q.replace('"', '""') + '"*'
+        rows = query(_Q_SEARCH_FTS, (phrase,))
+    else:
+        rows = query(_Q_SEARCH_LIKE, (f"%{q}%", f"%{q}%"))
     return {"results": rows, "count": len(rows), "status": 200}
 
 
@@ -39,7 +59,7 @@ def handle_create_product(data: dict) -> dict:
     if not name or price <= 0:
         return {"error": "Invalid product data", "status": 400}
     pid = execute(
-        "INSERT INTO products (name, description, price, stock, category) VALUES (?, ?, ?, ?, ?)",
+        _SQL_INSERT,
         (name, data.get("description", ""), price,
          int(data.get("stock", 0)), data.get("category", "")),
     )
@@ -48,11 +68,11 @@ def handle_create_product(data: dict) -> dict:
 
 def handle_update_stock(product_id: int, delta: int) -> dict:
     """PATCH /products/<id>/stock — adjust stock level."""
-    product = query("SELECT * FROM products WHERE id = ?", (product_id,), one=True)
+    product = query(_Q_STOCK, (product_id,), one=True, as_dict=False)
     if not product:
         return {"error": "Product not found", "status": 404}
     new_stock = product["stock"] + delta
     if new_stock < 0:
         return {"error": "Insufficient stock", "status": 400}
-    execute("UPDATE products SET stock = ? WHERE id = ?", (new_stock, product_id))
+    execute(_SQL_SET_STOCK, (new_stock, product_id))
     return {"product_id": product_id, "new_stock": new_stock, "status": 200}
@@ -5,6 +5,9 @@ User routes — registration, login, profile.
 from app.auth import register_user, login_user, get_current_user
 from app.database import query
 
+_Q_ID_BY_USERNAME = "SELECT id FROM users WHERE username = ?"
+_Q_LIST = "SELECT id, username, email, is_admin FROM users ORDER BY id LIMIT ? OFFSET ?"
+
 
 def handle_register(data: dict) -> dict:
     """POST /register handler."""
@@ -18,7 +21,7 @@ def handle_register(data: dict) -> dict:
     if len(password) < 6:
         return {"error": "Password too short", "status": 400}
 
-    existing = query("SELECT id FROM users WHERE username = ?", (username,), one=True)
+    existing = query(_Q_ID_BY_USERNAME, (username,), one=True, as_dict=False)
     if existing:
         return {"error": "Username already taken", "status": 409}
 
@@ -48,7 +51,7 @@ def handle_profile(token: str) -> dict:
     }
 
 
-def handle_list_users() -> dict:
+def handle_list_users(page: int = 1, per_page: int = 20) -> dict:
     """GET /users — admin only (no check implemented yet!)."""
-    users = query("SELECT id, username, email, is_admin FROM users")
-    return {"users": users, "status": 200}
+    users = query(_Q_LIST, (per_page, (page - 1) * per_page))
+    return {"users": users, "page": page, "per_page": per_page, "status": 200}
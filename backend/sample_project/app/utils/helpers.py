@@ -5,24 +5,50 @@ General‑purpose helper functions used across the project.
 import re
 import json
 from datetime import datetime
+from itertools import islice
+from typing import Iterable
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # stdlib fallback
+    _json_loads = json.loads
+
+_SLUG_STRIP = re.compile(r"[^\w\s-]+")
+_SLUG_COLLAPSE = re.compile(r"[\s_]+")
+_LEGACY_DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%dT%H:%M:%S")
 
 
 def slugify(text: str) -> str:
     """Convert a string to a URL‑friendly slug."""
-    text = text.lower().strip()
-    text = re.sub(r"[^\w\s-]", "", text)
-    return re.sub(r"[\s_]+", "-", text)
+    text = _SLUG_STRIP.sub("", text.lower().strip())
+    return _SLUG_COLLAPSE.sub("-", text)
+
+
+_PRICE_FMT = "${:,.2f}".format
 
 
 def format_price(amount: float) -> str:
     """Display a price with $ and two decimals."""
-    return f"${amount:,.2f}"
+    return _PRICE_FMT(amount)
 
 
 def parse_date(date_str: str) -> datetime | None:
-    """Try several date formats and return a datetime, or None."""
-    formats = ["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%d/%m/%Y", "%m/%d/%Y"]
-    for fmt in formats:
+    """Parse an ISO, DD/MM/YYYY or MM/DD/YYYY date, or return None.
+
+    The shape of the string picks the parser, so the common inputs cost a
+    single call instead of a chain of failing strptime attempts.
+    """
+    try:
+        if "/" in date_str:
+            # DD/MM wins whenever it is valid; MM/DD only when the middle
+            # field cannot be a month.
+            month_first = int(date_str.split("/", 2)[1]) > 12
+            return datetime.strptime(date_str, "%m/%d/%Y" if month_first else "%d/%m/%Y")
+        return datetime.fromisoformat(date_str)
+    except ValueError:
+        pass
+    # Legacy fallbacks: strptime also accepts unpadded fields (2024-1-5)
+    for fmt in _LEGACY_DATE_FORMATS:
         try:
             return datetime.strptime(date_str, fmt)
         except ValueError:
@@ -32,27 +58,41 @@ def parse_date(date_str: str) -> datetime | None:
 
 def paginate(items: list, page: int = 1, per_page: int = 20) -> dict:
     """Return a paginated slice of items with metadata."""
+    n = len(items)
+    start = (page - 1) * per_page
+    return {
+        "items": items[start:start + per_page],
+        "page": page,
+        "per_page": per_page,
+        "total": n,
+        "pages": -(-n // per_page),
+    }
+
+
+def paginate_iter(items: Iterable, page: int = 1, per_page: int = 20) -> dict:
+    """Like paginate, but for iterators (e.g. a DB cursor) of unknown length.
+
+    "items" is a lazy iterator over the page, so nothing is copied up front;
+    "total" and "pages" are None because counting would consume the source.
+    """
     start = (page - 1) * per_page
-    end = start + per_page
     return {
-        "items": items[start:end],
+        "items": islice(items, start, start + per_page),
         "page": page,
         "per_page": per_page,
-        "total": len(items),
-        "pages": (len(items) + per_page - 1) // per_page,
+        "total": None,
+        "pages": None,
     }
 
 
 def safe_json_loads(raw: str, default=None):
     """Parse JSON without raising — returns default on failure."""
     try:
-        return json.loads(raw)
+        return _json_loads(raw)
     except (json.JSONDecodeError, TypeError):
         return default
 
 
 def truncate(text: str, max_len: int = 200) -> str:
     """Truncate text with an ellipsis."""
-    if len(text) <= max_len:
-        return text
-    return text[: max_len - 1] + "…"
+    return text if len(text) <= max_len else f"{text[:max_len - 1]}…"
@@ -4,11 +4,13 @@ Input validators — used by route handlers before touching the DB.
 
 import re
 
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+_USERNAME_RE = re.compile(r"^[a-zA-Z0-9_]+$")
+
 
 def validate_email(email: str) -> bool:
     """Basic email format check."""
-    pattern = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
-    return bool(re.match(pattern, email))
+    return bool(_EMAIL_RE.match(email))
 
 
 def validate_username(username: str) -> tuple[bool, str]:
@@ -17,7 +19,7 @@ def validate_username(username: str) -> tuple[bool, str]:
         return False, "Username must be at least 3 characters"
     if len(username) > 30:
         return False, "Username must be at most 30 characters"
-    if not re.match(r"^[a-zA-Z0-9_]+$", username):
+    if not _USERNAME_RE.match(username):
         return False, "Username may only contain letters, digits, and underscores"
     return True, ""
 
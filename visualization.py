@@ -17,6 +17,11 @@ import random
 import sys
 import time as time_module
 
+try:
+    import numpy as np
+except ImportError:  # particles fall back to per-object Python updates
+    np = None
+
 # ===================================================================
 # CONFIGURATION
 # ===================================================================
@@ -24,6 +29,11 @@ import time as time_module
 WIDTH, HEIGHT = 1280, 800
 FPS = 60
 
+# Frames that change little are presented with display.update(rects);
+# past either limit a single flip() is cheaper
+DIRTY_RECT_LIMIT = 50
+DIRTY_AREA_FRACTION = 0.4
+
 # Premium dark palette (not pure black — uses #121212 base)
 COLORS = {
     "bg": (18, 18, 18),               # #121212
@@ -82,6 +92,217 @@ def lerp_color(c1, c2, t):
     return tuple(int(lerp(a, b, t)) for a, b in zip(c1, c2))
 
 
+# ===================================================================
+# SPRITE CACHES
+# ===================================================================
+# Small pre-rendered sprites reused across frames, so the render loop
+# batches cached blits instead of allocating a surface per draw call.
+
+ALPHA_LEVELS = 32          # alpha is quantized to this many steps for caching
+ARROW_ANGLE_BUCKETS = 64   # arrowhead directions (~5.6 degrees apart)
+ARROW_LEN = 10
+
+PARTICLE_SPRITES = {}      # (rgb, size, alpha level) -> Surface
+ARROW_SPRITES = {}         # (rgb, alpha level, angle bucket) -> Surface
+GLOW_SPRITES = {}          # (rgb, radius) -> Surface, opaque; alpha set per blit
+NODE_SPRITE_CACHE = {}     # (node_type, rgb, hover, radius) -> Surface
+HUD_CACHE = {}             # (font, text, rgb) -> rendered text
+PANEL_CACHE = {}           # (width, height) -> rounded title-panel background
+LINE_STAMPS = {}           # (rgb, start, end, width) -> (opaque line layer, top-left)
+
+NODE_ICONS = {"module": "M", "function": "ƒ", "class": "C", "import": "→", "call": "( )"}
+
+HAS_FBLITS = hasattr(pygame.Surface, "fblits")  # pygame-ce only
+
+
+def finalize(surf):
+    """Convert a freshly drawn SRCALPHA surface to the display's pixel format.
+
+    Cached sprites are blitted every frame, so paying the conversion once
+    keeps SDL on its fast blit path. A no-op until set_mode has been called.
+    """
+    if pygame.display.get_surface() is None:
+        return surf
+    return surf.convert_alpha()
+
+
+def blit_batch(surface, blit_list):
+    """Blit a list of (sprite, pos) pairs in a single call."""
+    if not blit_list:
+        return
+    if HAS_FBLITS:
+        surface.fblits(blit_list)
+    else:
+        surface.blits(blit_list, doreturn=False)
+
+
+def present(rects, screen_size):
+    """Show the frame, updating only *rects* while they cover little of it.
+
+    *rects* is None when the whole screen changed.
+    """
+    if rects is not None and len(rects) <= DIRTY_RECT_LIMIT:
+        w, h = screen_size
+        if sum(r.w * r.h for r in rects) < DIRTY_AREA_FRACTION * w * h:
+            pygame.display.update(rects)
+            return
+    pygame.display.flip()
+
+
+def line_layer(rgba, start, end, width):
+    """A line on an SRCALPHA layer sized to its bounding box.
+
+    Returns (layer, top-left position to blit it at).
+    """
+    (x1, y1), (x2, y2) = start, end
+    left, top = min(x1, x2) - width, min(y1, y2) - width
+    layer = pygame.Surface((abs(x2 - x1) + width * 2 + 1, abs(y2 - y1) + width * 2 + 1),
+                           pygame.SRCALPHA)
+    pygame.draw.line(layer, rgba, (x1 - left, y1 - top), (x2 - left, y2 - top), width)
+    return layer, (left, top)
+
+
+def draw_alpha_line(surface, rgba, start, end, width):
+    """Translucent line via a scratch surface sized to its bounding box.
+
+    pygame.draw ignores alpha on an opaque target, so the line still needs
+    its own SRCALPHA layer — just not a full-screen one. Returns the
+    touched rect.
+    """
+    return surface.blit(*line_layer(rgba, start, end, width))
+
+
+def line_stamp(rgb, start, end, width):
+    """Cached opaque line layer; callers fade it with set_alpha().
+
+    Only for segments whose endpoints no longer move, so the cache stays
+    bounded by the number of distinct settled segments.
+    """
+    key = (rgb, start, end, width)
+    stamp = LINE_STAMPS.get(key)
+    if stamp is None:
+        layer, pos = line_layer((*rgb, 255), start, end, width)
+        stamp = LINE_STAMPS[key] = (finalize(layer), pos)
+    return stamp
+
+
+def alpha_level(alpha):
+    """Quantize a 0..1 opacity into one of ALPHA_LEVELS cache keys."""
+    return min(ALPHA_LEVELS, max(0, int(alpha * ALPHA_LEVELS + 0.5)))
+
+
+def particle_sprite(rgb, size, level):
+    """Soft disc of radius *size* at the given alpha level."""
+    key = (rgb, size, level)
+    sprite = PARTICLE_SPRITES.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        alpha = int(255 * level / ALPHA_LEVELS)
+        pygame.draw.circle(sprite, (*rgb, alpha), (size, size), size)
+        PARTICLE_SPRITES[key] = sprite = finalize(sprite)
+    return sprite
+
+
+def arrow_sprite(rgb, level, angle):
+    """Arrowhead pointing along *angle*; its tip sits at the sprite centre."""
+    bucket = round(angle * ARROW_ANGLE_BUCKETS / (2 * math.pi)) % ARROW_ANGLE_BUCKETS
+    key = (rgb, level, bucket)
+    sprite = ARROW_SPRITES.get(key)
+    if sprite is None:
+        a = bucket * 2 * math.pi / ARROW_ANGLE_BUCKETS
+        c = ARROW_LEN + 1
+        sprite = pygame.Surface((c * 2, c * 2), pygame.SRCALPHA)
+        alpha = int(255 * level / ALPHA_LEVELS)
+        pygame.draw.polygon(sprite, (*rgb, alpha), [
+            (c, c),
+            (round(c - ARROW_LEN * math.cos(a - 0.4)), round(c - ARROW_LEN * math.sin(a - 0.4))),
+            (round(c - ARROW_LEN * math.cos(a + 0.4)), round(c - ARROW_LEN * math.sin(a + 0.4))),
+        ])
+        ARROW_SPRITES[key] = sprite = finalize(sprite)
+    return sprite
+
+
+def glow_sprite(rgb, radius):
+    """Filled disc at full alpha; callers fade it with set_alpha()."""
+    key = (rgb, radius)
+    sprite = GLOW_SPRITES.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*rgb, 255), (radius, radius), radius)
+        GLOW_SPRITES[key] = sprite = finalize(sprite)
+    return sprite
+
+
+def node_sprite(node_type, rgb, hover, radius, font_small):
+    """Outer ring, filled body, border and type icon of a node at full opacity.
+
+    The node's centre is the centre of the returned sprite.
+    """
+    key = (node_type, rgb, hover, radius)
+    sprite = NODE_SPRITE_CACHE.get(key)
+    if sprite is None:
+        icon = font_small.render(NODE_ICONS.get(node_type, "?"), True, rgb)
+        c = max(radius + 5, icon.get_width() // 2 + 1, icon.get_height() // 2 + 3)
+        sprite = pygame.Surface((c * 2, c * 2), pygame.SRCALPHA)
+        # Outer ring
+        pygame.draw.circle(sprite, (*rgb, 120), (c, c), radius + 5, 2)
+        # Main circle + border
+        fill_color = lerp_color(COLORS["surface"], rgb, 0.25 if not hover else 0.5)
+        pygame.draw.circle(sprite, (*fill_color, 220), (c, c), radius)
+        border_color = rgb if hover else lerp_color(rgb, COLORS["border"], 0.3)
+        pygame.draw.circle(sprite, (*border_color, 255), (c, c), radius, 2)
+        # Type icon (small letter inside)
+        sprite.blit(icon, icon.get_rect(center=(c, c - 2)))
+        NODE_SPRITE_CACHE[key] = sprite = finalize(sprite)
+    return sprite
+
+
+def cached_render(font, text, color):
+    """font.render() memoized — HUD strings only change on step/pause.
+
+    The set of strings is small and fixed (titles, step counter, hints),
+    so the cache is never trimmed.
+    """
+    key = (font, text, color)
+    surf = HUD_CACHE.get(key)
+    if surf is None:
+        surf = HUD_CACHE[key] = finalize(font.render(text, True, color))
+    return surf
+
+
+def panel_background(w, h):
+    """Rounded translucent panel with a hairline border, one per size."""
+    key = (w, h)
+    panel = PANEL_CACHE.get(key)
+    if panel is None:
+        panel = pygame.Surface((w, h), pygame.SRCALPHA)
+        pygame.draw.rect(panel, (*COLORS["surface"], 220), panel.get_rect(), border_radius=12)
+        pygame.draw.rect(panel, (*COLORS["border"], 100), panel.get_rect(),
+                         width=1, border_radius=12)
+        PANEL_CACHE[key] = panel = finalize(panel)
+    return panel
+
+
+def build_background(size, spacing=40, alpha=15, bar_height=80):
+    """Opaque backdrop for a window of *size*: base colour, subtle grid and
+    the translucent top bar, composited once so a frame starts with a
+    single plain blit. Built after set_mode; rebuilt on resize.
+    """
+    w, h = size
+    bg = pygame.Surface((w, h))
+    bg.fill(COLORS["bg"])
+    overlay = pygame.Surface((w, h), pygame.SRCALPHA)
+    for gx in range(0, w, spacing):
+        pygame.draw.line(overlay, (*COLORS["border"], alpha), (gx, 0), (gx, h))
+    for gy in range(0, h, spacing):
+        pygame.draw.line(overlay, (*COLORS["border"], alpha), (0, gy), (w, gy))
+    bg.blit(overlay, (0, 0))
+    bar = pygame.Surface((w, bar_height), pygame.SRCALPHA)
+    bar.fill((*COLORS["surface"], 200))
+    bg.blit(bar, (0, 0))
+    return bg.convert()
+
+
 # ===================================================================
 # PARTICLE SYSTEM
 # ===================================================================
@@ -105,16 +326,17 @@ class Particle:
         if self.lifetime <= 0:
             self.alive = False
 
+    def sprite(self):
+        """Return (cached sprite, top-left) for the current frame."""
+        alpha = max(0, self.lifetime / self.max_lifetime)
+        size = max(1, int(self.size * alpha))
+        s = particle_sprite(self.color[:3], size, alpha_level(alpha * 0.7))
+        return s, (int(self.x) - size, int(self.y) - size)
+
     def draw(self, surface):
         if not self.alive:
             return
-        alpha = max(0, self.lifetime / self.max_lifetime)
-        r, g, b = self.color[:3]
-        size = max(1, int(self.size * alpha))
-        # Draw with transparency via a small surface
-        s = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-        pygame.draw.circle(s, (r, g, b, int(255 * alpha * 0.7)), (size, size), size)
-        surface.blit(s, (int(self.x) - size, int(self.y) - size))
+        surface.blit(*self.sprite())
 
 
 class ParticleSystem:
@@ -126,6 +348,11 @@ class ParticleSystem:
             v = (random.uniform(-spread, spread), random.uniform(-spread, spread))
             self.particles.append(Particle(x, y, color, v, lifetime, size))
 
+    def emit_many(self, specs):
+        """emit() for a batch of (x, y, color, count, spread, lifetime, size)."""
+        for spec in specs:
+            self.emit(*spec)
+
     def emit_trail(self, x1, y1, x2, y2, color, count=10, lifetime=0.5):
         for i in range(count):
             t = i / max(1, count - 1)
@@ -143,8 +370,109 @@ class ParticleSystem:
             p.update(dt)
 
     def draw(self, surface):
-        for p in self.particles:
-            p.draw(surface)
+        """Blit every live particle; returns their bounding rect, or None."""
+        sprites = [p.sprite() for p in self.particles if p.alive]
+        if not sprites:
+            return None
+        blit_batch(surface, sprites)
+        return pygame.Rect(sprites[0][1], sprites[0][0].get_size()).unionall(
+            [pygame.Rect(pos, s.get_size()) for s, pos in sprites[1:]])
+
+
+MAX_PARTICLES = 2048
+
+
+class ParticleArrays:
+    """Drop-in ParticleSystem storing particles as NumPy columns.
+
+    Fields live in fixed-size float32 arrays (structure of arrays), so
+    update() is a handful of vector ops instead of a Python loop. emit()
+    writes into a ring buffer: a full pool recycles its oldest slots.
+    """
+
+    def __init__(self, capacity=MAX_PARTICLES):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), np.float32)
+        self.vel = np.zeros((capacity, 2), np.float32)
+        self.life = np.zeros(capacity, np.float32)      # <= 0 means free
+        self.max_life = np.ones(capacity, np.float32)
+        self.size = np.zeros(capacity, np.float32)
+        self.color = np.zeros(capacity, np.int32)       # index into palette
+        self.palette = []
+        self.palette_index = {}
+        self.head = 0
+
+    def _slots(self, count):
+        idx = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+        return idx
+
+    def _color_id(self, color):
+        rgb = tuple(color[:3])
+        cid = self.palette_index.get(rgb)
+        if cid is None:
+            cid = self.palette_index[rgb] = len(self.palette)
+            self.palette.append(rgb)
+        return cid
+
+    def emit(self, x, y, color, count=5, spread=2.0, lifetime=0.8, size=3):
+        idx = self._slots(count)
+        self.pos[idx] = (x, y)
+        self.vel[idx] = np.random.uniform(-spread, spread, (count, 2))
+        self.life[idx] = lifetime
+        self.max_life[idx] = lifetime
+        self.size[idx] = size
+        self.color[idx] = self._color_id(color)
+
+    def emit_many(self, specs):
+        """emit() for a batch of (x, y, color, count, spread, lifetime, size),
+        written into the arrays in one vectorized pass."""
+        if not specs:
+            return
+        xs, ys, colors, counts, spreads, lifetimes, sizes = zip(*specs)
+        counts = np.array(counts)
+        idx = self._slots(int(counts.sum()))
+        self.pos[idx, 0] = np.repeat(xs, counts)
+        self.pos[idx, 1] = np.repeat(ys, counts)
+        self.vel[idx] = (np.random.uniform(-1, 1, (idx.size, 2))
+                         * np.repeat(spreads, counts)[:, None])
+        self.life[idx] = self.max_life[idx] = np.repeat(lifetimes, counts)
+        self.size[idx] = np.repeat(sizes, counts)
+        self.color[idx] = np.repeat([self._color_id(c) for c in colors], counts)
+
+    def emit_trail(self, x1, y1, x2, y2, color, count=10, lifetime=0.5):
+        idx = self._slots(count)
+        t = np.arange(count) / max(1, count - 1)
+        self.pos[idx, 0] = x1 + (x2 - x1) * t + np.random.uniform(-3, 3, count)
+        self.pos[idx, 1] = y1 + (y2 - y1) * t + np.random.uniform(-3, 3, count)
+        self.vel[idx] = 0
+        life = lifetime + np.random.uniform(0, 0.3, count)
+        self.life[idx] = life
+        self.max_life[idx] = life
+        self.size[idx] = 2
+        self.color[idx] = self._color_id(color)
+
+    def update(self, dt):
+        self.pos += self.vel * (dt * 60)
+        self.life -= dt
+
+    def draw(self, surface):
+        """Blit every live particle; returns their bounding rect, or None."""
+        live = np.flatnonzero(self.life > 0)
+        if not live.size:
+            return None
+        alpha = self.life[live] / self.max_life[live]
+        sizes = np.maximum(1, (self.size[live] * alpha).astype(np.int32))
+        levels = np.clip((alpha * (0.7 * ALPHA_LEVELS) + 0.5).astype(np.int32), 0, ALPHA_LEVELS)
+        xy = self.pos[live].astype(np.int32) - sizes[:, None]
+        palette = self.palette
+        blit_batch(surface, [
+            (particle_sprite(palette[c], sz, lv), (px, py))
+            for c, sz, lv, (px, py) in zip(self.color[live].tolist(), sizes.tolist(),
+                                           levels.tolist(), xy.tolist())
+        ])
+        (x0, y0), (x1, y1) = xy.min(0).tolist(), (xy + 2 * sizes[:, None]).max(0).tolist()
+        return pygame.Rect(x0, y0, x1 - x0, y1 - y0)
 
 
 # ===================================================================
@@ -173,32 +501,41 @@ class AnimatedNode:
         self.pulse = 0
         self.scale = 0
         self.opacity = 0
+        self.hover_r2 = 0
+        self.settled = False  # intro animation finished; easing is skipped
+        self._label_surf = None  # rendered on first draw (fonts live in main)
+        self._type_surf = None
 
     def start(self):
         self.visible = True
         self.anim_time = 0
+        self.settled = False
 
     def update(self, dt, mouse_pos):
         if not self.visible:
             return
 
         self.anim_time += dt
-        t = min(1, self.anim_time / self.anim_duration)
-
-        # Position animation
-        eased = ease_out_back(t)
-        self.x = lerp(self.target_x, self.target_x, eased)
-        self.y = lerp(self.target_y - 80, self.target_y, eased)
-
-        # Scale animation
-        self.scale = ease_out_elastic(t)
-        self.current_radius = self.target_radius * self.scale
-        self.opacity = min(1, t * 2)
+        if not self.settled:
+            t = min(1, self.anim_time / self.anim_duration)
+
+            # Position animation
+            eased = ease_out_back(t)
+            self.x = lerp(self.target_x, self.target_x, eased)
+            self.y = lerp(self.target_y - 80, self.target_y, eased)
+
+            # Scale animation
+            self.scale = ease_out_elastic(t)
+            self.current_radius = self.target_radius * self.scale
+            self.opacity = min(1, t * 2)
+            self.hover_r2 = (self.current_radius + 5) ** 2
+            # Every easing curve ends exactly at 1, so the state is now final
+            self.settled = t >= 1
 
         # Hover detection
         dx = mouse_pos[0] - self.x
         dy = mouse_pos[1] - self.y
-        self.hover = (dx * dx + dy * dy) <= (self.current_radius + 5) ** 2
+        self.hover = (dx * dx + dy * dy) <= self.hover_r2
 
         # Pulse
         self.pulse += dt * 2
@@ -206,67 +543,58 @@ class AnimatedNode:
             self.pulse -= math.pi * 2
 
     def draw(self, surface, font_small, font_label):
+        """Draw the node; returns its bounding rect while it is still
+        changing from frame to frame (intro, glow, hover), else None."""
         if not self.visible or self.opacity < 0.01:
-            return
+            return None
 
         r = max(1, int(self.current_radius))
         x, y = int(self.x), int(self.y)
 
-        # Glow effect
-        if self.hover or self.anim_time < 1.0:
-            glow_r = r + 12 + int(math.sin(self.pulse) * 3)
-            glow_surf = pygame.Surface((glow_r * 2, glow_r * 2), pygame.SRCALPHA)
+        # Text is rendered once per node; opacity is applied as surface alpha
+        if self._label_surf is None:
+            self._label_surf = finalize(font_label.render(self.label, True, COLORS["text"]))
+            self._type_surf = finalize(font_small.render(self.node_type, True,
+                                                         COLORS["text_dim"]))
+
+        # Cull: glow reaches r + 15 around the centre, the labels hang below
+        half_w = max(r + 15, self._label_surf.get_width() // 2 + 1,
+                     self._type_surf.get_width() // 2 + 1)
+        bounds = pygame.Rect(x - half_w, y - r - 15, half_w * 2, r * 2 + 60)
+        if not surface.get_clip().colliderect(bounds):
+            return None
+
+        # Glow effect: on hover, or fading with the intro; skipped while
+        # too faint to see (alpha < 4 at the start of the fade-in)
+        if self.hover:
+            glow_alpha = 60
+        elif self.anim_time < 1.0:
             glow_alpha = int(40 * self.opacity)
-            if self.hover:
-                glow_alpha = 60
-            pygame.draw.circle(glow_surf, (*self.color, glow_alpha), (glow_r, glow_r), glow_r)
-            surface.blit(glow_surf, (x - glow_r, y - glow_r))
-
-        # Outer ring
-        ring_r = r + 3
-        ring_alpha = int(120 * self.opacity)
-        ring_surf = pygame.Surface((ring_r * 2 + 4, ring_r * 2 + 4), pygame.SRCALPHA)
-        pygame.draw.circle(ring_surf, (*self.color, ring_alpha),
-                           (ring_r + 2, ring_r + 2), ring_r + 2, 2)
-        surface.blit(ring_surf, (x - ring_r - 2, y - ring_r - 2))
-
-        # Main circle
-        main_surf = pygame.Surface((r * 2 + 2, r * 2 + 2), pygame.SRCALPHA)
-        fill_color = lerp_color(COLORS["surface"], self.color, 0.25 if not self.hover else 0.5)
-        fill_alpha = int(220 * self.opacity)
-        pygame.draw.circle(main_surf, (*fill_color, fill_alpha), (r + 1, r + 1), r)
-        # Border
-        border_color = self.color if self.hover else lerp_color(self.color, COLORS["border"], 0.3)
-        pygame.draw.circle(main_surf, (*border_color, int(255 * self.opacity)),
-                           (r + 1, r + 1), r, 2)
-        surface.blit(main_surf, (x - r - 1, y - r - 1))
+        else:
+            glow_alpha = 0
+        if glow_alpha >= 4:
+            glow_r = r + 12 + int(math.sin(self.pulse) * 3)
+            glow = glow_sprite(self.color, glow_r)
+            glow.set_alpha(glow_alpha)
+            surface.blit(glow, (x - glow_r, y - glow_r))
 
-        # Type icon (small letter inside)
-        icon_map = {"module": "M", "function": "ƒ", "class": "C", "import": "→", "call": "( )"}
-        icon_text = icon_map.get(self.node_type, "?")
-        icon_surf = font_small.render(icon_text, True, self.color)
-        icon_rect = icon_surf.get_rect(center=(x, y - 2))
-        # Apply opacity
-        icon_alpha = pygame.Surface(icon_surf.get_size(), pygame.SRCALPHA)
-        icon_alpha.blit(icon_surf, (0, 0))
-        icon_alpha.set_alpha(int(255 * self.opacity))
-        surface.blit(icon_alpha, icon_rect)
+        # Ring, body and icon come pre-composited; fade the whole sprite
+        body = node_sprite(self.node_type, self.color, self.hover, r, font_small)
+        body.set_alpha(int(255 * self.opacity))
+        half = body.get_width() // 2
+        surface.blit(body, (x - half, y - half))
 
         # Label below
-        label_surf = font_label.render(self.label, True, COLORS["text"])
-        label_rect = label_surf.get_rect(center=(x, y + r + 16))
-        label_alpha_surf = pygame.Surface(label_surf.get_size(), pygame.SRCALPHA)
-        label_alpha_surf.blit(label_surf, (0, 0))
-        label_alpha_surf.set_alpha(int(220 * self.opacity))
-        surface.blit(label_alpha_surf, label_rect)
+        self._label_surf.set_alpha(int(220 * self.opacity))
+        surface.blit(self._label_surf, self._label_surf.get_rect(center=(x, y + r + 16)))
 
         # Type label (smaller, dimmer)
-        type_surf = font_small.render(self.node_type, True, COLORS["text_dim"])
-        type_rect = type_surf.get_rect(center=(x, y + r + 32))
-        type_alpha_surf = pygame.Surface(type_surf.get_size(), pygame.SRCALPHA)
-        type_alpha_surf.blit(type_surf, (0, 0))
-        type_alpha_surf.set_alpha(int(150 * self.opacity))
-        surface.blit(type_alpha_surf, type_rect)
+        self._type_surf.set_alpha(int(150 * self.opacity))
+        surface.blit(self._type_surf, self._type_surf.get_rect(center=(x, y + r + 32)))
+
+        if self.settled and not self.hover and self.anim_time >= 1.0:
+            return None
+        return bounds
 
 
 # ===================================================================
@@ -284,6 +612,10 @@ class AnimatedEdge:
         self.anim_duration = 0.6
         self.visible = False
         self.progress = 0
+        self._geom = None             # (angle, midpoint) once both ends settle
+        self._label_composite = None  # label text on its rounded background
+        self._line = None             # (layer, pos) once the edge is fully static
+        self._arrow = None            # (atlas sprite, pos), likewise
 
     def start(self):
         self.visible = True
@@ -295,10 +627,35 @@ class AnimatedEdge:
         self.anim_time += dt
         t = min(1, self.anim_time / self.anim_duration)
         self.progress = ease_out_cubic(t)
+        if self._geom is None and self.source.settled and self.target.settled:
+            self._geom = self.geometry()
 
-    def draw(self, surface, font_small, particles):
+    def geometry(self):
+        """Direction angle and midpoint of the source -> target segment."""
+        sx, sy = self.source.x, self.source.y
+        tx, ty = self.target.x, self.target.y
+        return math.atan2(ty - sy, tx - sx), ((sx + tx) / 2, (sy + ty) / 2)
+
+    def label_composite(self, font_small):
+        """Label text pre-blitted onto its translucent pill, built once."""
+        if self._label_composite is None:
+            lbl_surf = font_small.render(self.label, True, COLORS["text_dim"])
+            bg_rect = lbl_surf.get_rect().inflate(8, 4)
+            composite = pygame.Surface(bg_rect.size, pygame.SRCALPHA)
+            pygame.draw.rect(composite, (*COLORS["surface"], 200), composite.get_rect(),
+                             border_radius=4)
+            composite.blit(lbl_surf, lbl_surf.get_rect(center=composite.get_rect().center))
+            self._label_composite = finalize(composite)
+        return self._label_composite
+
+    def draw(self, surface, font_small, particles, blits=None):
+        """Draw the edge; if *blits* is given, the arrowhead is appended to
+        it for a batched blit instead of being drawn immediately.
+
+        Returns the edge's bounding rect until it is fully static, else None.
+        """
         if not self.visible or self.progress < 0.01:
-            return
+            return None
 
         sx, sy = self.source.x, self.source.y
         tx, ty = self.target.x, self.target.y
@@ -307,28 +664,42 @@ class AnimatedEdge:
         cx = lerp(sx, tx, self.progress)
         cy = lerp(sy, ty, self.progress)
 
-        # Draw line with alpha
-        line_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        alpha = int(180 * min(1, self.progress * 2))
-        pygame.draw.line(line_surf, (*self.color, alpha),
-                         (int(sx), int(sy)), (int(cx), int(cy)), 2)
-        surface.blit(line_surf, (0, 0))
+        # Endpoints are static once both nodes settle; reuse the geometry
+        angle, (mx, my) = self._geom or self.geometry()
+
+        # Cull: drawn segment plus arrowhead margin, plus the label if shown
+        m = ARROW_LEN + 2
+        bounds = pygame.Rect(min(sx, cx) - m, min(sy, cy) - m,
+                             abs(cx - sx) + m * 2, abs(cy - sy) + m * 2)
+        label_rect = None
+        if self.progress > 0.5 and self.label:
+            label_rect = self.label_composite(font_small).get_rect(center=(int(mx), int(my) - 10))
+            bounds.union_ip(label_rect)
+        if not surface.get_clip().colliderect(bounds):
+            return None
 
-        # Arrowhead at current end
+        # Draw line with alpha; once fully grown between settled nodes the
+        # stroke never changes, so its rendered layer is kept and re-blitted
+        alpha = int(180 * min(1, self.progress * 2))
+        line = self._line
+        if line is None:
+            line = line_layer((*self.color, alpha), (int(sx), int(sy)), (int(cx), int(cy)), 2)
+            if self._geom is not None and self.progress >= 1:
+                self._line = line = (finalize(line[0]), line[1])
+        surface.blit(*line)
+
+        # Arrowhead at current end (cached sprite, tip at its centre)
         if self.progress > 0.3:
-            angle = math.atan2(ty - sy, tx - sx)
-            arrow_len = 10
-            arr_x1 = cx - arrow_len * math.cos(angle - 0.4)
-            arr_y1 = cy - arrow_len * math.sin(angle - 0.4)
-            arr_x2 = cx - arrow_len * math.cos(angle + 0.4)
-            arr_y2 = cy - arrow_len * math.sin(angle + 0.4)
-            arrow_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            pygame.draw.polygon(arrow_surf, (*self.color, alpha), [
-                (int(cx), int(cy)),
-                (int(arr_x1), int(arr_y1)),
-                (int(arr_x2), int(arr_y2)),
-            ])
-            surface.blit(arrow_surf, (0, 0))
+            arrow = self._arrow
+            if arrow is None:
+                arrow = (arrow_sprite(self.color[:3], alpha_level(alpha / 255), angle),
+                         (int(cx) - ARROW_LEN - 1, int(cy) - ARROW_LEN - 1))
+                if self._line is not None:
+                    self._arrow = arrow
+            if blits is None:
+                surface.blit(*arrow)
+            else:
+                blits.append(arrow)
 
         # Emit particles at the leading edge
         if 0.1 < self.progress < 0.95:
@@ -336,17 +707,10 @@ class AnimatedEdge:
                 particles.emit(cx, cy, self.color, count=2, spread=1.5, lifetime=0.4, size=2)
 
         # Label at midpoint
-        if self.progress > 0.5 and self.label:
-            mx = (sx + tx) / 2
-            my = (sy + ty) / 2
+        if label_rect is not None:
+            surface.blit(self.label_composite(font_small), label_rect)
 
-            lbl_surf = font_small.render(self.label, True, COLORS["text_dim"])
-            bg_rect = lbl_surf.get_rect(center=(int(mx), int(my) - 10))
-            bg_rect.inflate_ip(8, 4)
-            bg_surf = pygame.Surface(bg_rect.size, pygame.SRCALPHA)
-            pygame.draw.rect(bg_surf, (*COLORS["surface"], 200), bg_surf.get_rect(), border_radius=4)
-            surface.blit(bg_surf, bg_rect)
-            surface.blit(lbl_surf, lbl_surf.get_rect(center=(int(mx), int(my) - 10)))
+        return None if self._arrow is not None else bounds
 
 
 # ===================================================================
@@ -458,6 +822,7 @@ def main():
     pygame.display.set_caption("🧊 Chillax.AI — Code Graph Visualization")
     screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
     clock = pygame.time.Clock()
+    bg_surf = build_background(screen.get_size())
 
     # Fonts
     try:
@@ -477,7 +842,7 @@ def main():
     steps = build_demo_scenario()
     all_nodes = {}     # id -> AnimatedNode
     all_edges = []     # AnimatedEdge list
-    particles = ParticleSystem()
+    particles = ParticleArrays() if np is not None else ParticleSystem()
 
     current_step = -1
     step_time = 0
@@ -495,12 +860,18 @@ def main():
     highlight_set = set()
     highlight_pulse = 0
 
+    # Dirty rects: regions that changed this frame and last frame (what
+    # moved away must be repainted too); full_redraw forces a flip
+    prev_dirty = []
+    full_redraw = True
+
     def advance_step():
         nonlocal current_step, step_time, current_title, current_subtitle
-        nonlocal highlight_set
+        nonlocal highlight_set, full_redraw
 
         current_step += 1
         step_time = 0
+        full_redraw = True  # title, HUD and graph all change
 
         if current_step >= len(steps):
             current_step = -1
@@ -516,13 +887,14 @@ def main():
         current_title = step.get("title", "")
         current_subtitle = step.get("subtitle", "")
 
-        # Add new nodes
+        # Add new nodes, with one batched burst of particles for all of them
+        bursts = []
         for i, (nid, nx, ny, ntype) in enumerate(step.get("nodes", [])):
             node = AnimatedNode(nid, nid, ntype, nx, ny, delay=i * 0.15)
             all_nodes[nid] = node
             node.start()
-            particles.emit(nx, ny, NODE_COLORS.get(ntype, COLORS["blue"]),
-                           count=8, spread=3, lifetime=0.6, size=4)
+            bursts.append((nx, ny, NODE_COLORS.get(ntype, COLORS["blue"]), 8, 3, 0.6, 4))
+        particles.emit_many(bursts)
 
         # Add new edges
         edge_color = step.get("edge_color", COLORS["blue"])
@@ -552,6 +924,9 @@ def main():
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.VIDEORESIZE:
+                bg_surf = build_background(screen.get_size())
+                full_redraw = True
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE or event.key == pygame.K_q:
                     running = False
@@ -566,10 +941,13 @@ def main():
                     highlight_set.clear()
                     current_title = "Press SPACE or wait to begin"
                     current_subtitle = "Chillax.AI — Visualizing code relationships"
+                    full_redraw = True
                 elif event.key == pygame.K_p:
                     paused = not paused
+                    full_redraw = True
                 elif event.key == pygame.K_h:
                     show_instructions = not show_instructions
+                    full_redraw = True
 
         # Auto-advance
         if not paused:
@@ -578,7 +956,9 @@ def main():
                 advance_step()
 
         # Update
-        highlight_pulse += dt * 3
+        # Wrapped like the node pulse; one sine per frame feeds every highlight
+        highlight_pulse = (highlight_pulse + dt * 3) % (2 * math.pi)
+        hl_wave = math.sin(highlight_pulse)
         particles.update(dt)
 
         for node in all_nodes.values():
@@ -588,89 +968,87 @@ def main():
             edge.update(dt)
 
         # ============ DRAW ============
-        screen.fill(COLORS["bg"])
-
-        # Subtle grid pattern
-        grid_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        grid_alpha = 15
-        for gx in range(0, WIDTH, 40):
-            pygame.draw.line(grid_surf, (*COLORS["border"], grid_alpha), (gx, 0), (gx, HEIGHT))
-        for gy in range(0, HEIGHT, 40):
-            pygame.draw.line(grid_surf, (*COLORS["border"], grid_alpha), (0, gy), (WIDTH, gy))
-        screen.blit(grid_surf, (0, 0))
-
-        # Draw edges (behind nodes)
+        # Background, grid and top bar (cached; rebuilt on resize)
+        screen.blit(bg_surf, (0, 0))
+
+        # Draw edges (behind nodes); arrowheads go out in one batch
+        dirty = []
+        edge_blits = []
         for edge in all_edges:
-            edge.draw(screen, font_small, particles)
+            rect = edge.draw(screen, font_small, particles, edge_blits)
+            if rect is not None:
+                dirty.append(rect)
+        blit_batch(screen, edge_blits)
 
         # Draw highlight connections
+        emit_queue = []
         if highlight_set:
             hl_nodes = [all_nodes[h] for h in highlight_set if h in all_nodes]
+            pulse_alpha = int(100 + 80 * hl_wave)
             for i in range(len(hl_nodes) - 1):
                 n1, n2 = hl_nodes[i], hl_nodes[i + 1]
-                pulse_alpha = int(100 + 80 * math.sin(highlight_pulse))
-                hl_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                pygame.draw.line(hl_surf, (*COLORS["pink"], pulse_alpha),
-                                 (int(n1.x), int(n1.y)), (int(n2.x), int(n2.y)), 4)
-                screen.blit(hl_surf, (0, 0))
+                p1, p2 = (int(n1.x), int(n1.y)), (int(n2.x), int(n2.y))
+                if n1.settled and n2.settled:
+                    # Static segment: reuse its stamp, only the alpha pulses
+                    layer, pos = line_stamp(COLORS["pink"], p1, p2, 4)
+                    layer.set_alpha(pulse_alpha)
+                    dirty.append(screen.blit(layer, pos))
+                else:
+                    dirty.append(draw_alpha_line(screen, (*COLORS["pink"], pulse_alpha),
+                                                 p1, p2, 4))
                 # Trail particles
                 if random.random() < 0.15:
                     mx = (n1.x + n2.x) / 2 + random.uniform(-10, 10)
                     my = (n1.y + n2.y) / 2 + random.uniform(-10, 10)
-                    particles.emit(mx, my, COLORS["pink"], count=1, spread=1, lifetime=0.5, size=2)
+                    emit_queue.append((mx, my, COLORS["pink"], 1, 1, 0.5, 2))
 
         # Draw nodes
         for node in all_nodes.values():
             # Highlight pulse
             if node.id in highlight_set:
-                pulse_r = int(node.current_radius + 8 + 4 * math.sin(highlight_pulse))
-                pulse_surf = pygame.Surface((pulse_r * 2, pulse_r * 2), pygame.SRCALPHA)
-                pulse_alpha = int(60 + 30 * math.sin(highlight_pulse))
-                pygame.draw.circle(pulse_surf, (*COLORS["pink"], pulse_alpha),
-                                   (pulse_r, pulse_r), pulse_r)
-                screen.blit(pulse_surf, (int(node.x) - pulse_r, int(node.y) - pulse_r))
-            node.draw(screen, font_small, font_label)
-
-        # Draw particles (on top)
-        particles.draw(screen)
+                pulse_r = int(node.current_radius + 8 + 4 * hl_wave)
+                pulse_surf = glow_sprite(COLORS["pink"], pulse_r)
+                pulse_surf.set_alpha(int(60 + 30 * hl_wave))
+                dirty.append(screen.blit(pulse_surf, (int(node.x) - pulse_r,
+                                                      int(node.y) - pulse_r)))
+            rect = node.draw(screen, font_small, font_label)
+            if rect is not None:
+                dirty.append(rect)
+
+        # Draw particles (on top); this frame's trail sparks join first
+        particles.emit_many(emit_queue)
+        rect = particles.draw(screen)
+        if rect is not None:
+            dirty.append(rect)
 
         # ---- HUD: Title & Subtitle ----
-        # Top bar
-        top_bar = pygame.Surface((WIDTH, 80), pygame.SRCALPHA)
-        pygame.draw.rect(top_bar, (*COLORS["surface"], 200), top_bar.get_rect())
-        screen.blit(top_bar, (0, 0))
-
+        # (the top bar itself is baked into bg_surf)
         # Logo
-        logo_text = font_title.render("🧊 Chillax.AI", True, COLORS["text"])
+        logo_text = cached_render(font_title, "🧊 Chillax.AI", COLORS["text"])
         screen.blit(logo_text, (24, 12))
 
         # Step indicator
         step_text = f"Step {current_step + 1}/{len(steps)}" if current_step >= 0 else "Ready"
-        step_surf = font_hud.render(step_text, True, COLORS["blue"])
+        step_surf = cached_render(font_hud, step_text, COLORS["blue"])
         screen.blit(step_surf, (WIDTH - step_surf.get_width() - 24, 16))
 
         # Status
         if paused:
-            pause_surf = font_hud.render("⏸ PAUSED", True, COLORS["orange"])
+            pause_surf = cached_render(font_hud, "⏸ PAUSED", COLORS["orange"])
             screen.blit(pause_surf, (WIDTH - pause_surf.get_width() - 24, 36))
 
         # Title / subtitle panel (bottom)
         if current_title:
             # Background pill
-            title_surf = font_title.render(current_title, True, COLORS["text"])
-            sub_surf = font_subtitle.render(current_subtitle, True, COLORS["text_dim"])
+            title_surf = cached_render(font_title, current_title, COLORS["text"])
+            sub_surf = cached_render(font_subtitle, current_subtitle, COLORS["text_dim"])
 
             panel_w = max(title_surf.get_width(), sub_surf.get_width()) + 60
             panel_h = 80
             panel_x = (WIDTH - panel_w) // 2
             panel_y = HEIGHT - panel_h - 24
 
-            panel_bg = pygame.Surface((panel_w, panel_h), pygame.SRCALPHA)
-            pygame.draw.rect(panel_bg, (*COLORS["surface"], 220),
-                             panel_bg.get_rect(), border_radius=12)
-            pygame.draw.rect(panel_bg, (*COLORS["border"], 100),
-                             panel_bg.get_rect(), width=1, border_radius=12)
-            screen.blit(panel_bg, (panel_x, panel_y))
+            screen.blit(panel_background(panel_w, panel_h), (panel_x, panel_y))
 
             screen.blit(title_surf,
                          title_surf.get_rect(center=(WIDTH // 2, panel_y + 26)))
@@ -684,11 +1062,13 @@ def main():
             ]
             instr_y = HEIGHT - 10
             for line in reversed(instr_lines):
-                instr_surf = font_hud.render(line, True, COLORS["text_dim"])
+                instr_surf = cached_render(font_hud, line, COLORS["text_dim"])
                 screen.blit(instr_surf, (24, instr_y - instr_surf.get_height()))
                 instr_y -= instr_surf.get_height() + 4
 
-        pygame.display.flip()
+        present(None if full_redraw else dirty + prev_dirty, screen.get_size())
+        prev_dirty = dirty
+        full_redraw = False
 
     pygame.quit()
     sys.exit()